@@ -1,14 +1,29 @@
 import streamlit as st
-from sentence_transformers import SentenceTransformer, util
-import pandas as pd
-import torch
+from sentence_transformers import SentenceTransformer
+import os
+from embedding_store import EmbeddingStore
+from vector_index import load_or_build_index
+from query_encoder import BatchingQueryEncoder
+from catalog_filters import CatalogFilters
+from ingest import load_catalog
+
+MODEL_NAME = 'paraphrase-MiniLM-L6-v2'
+# Typed Parquet cache of the CSV, rebuilt only when the CSV's hash changes
+CATALOG_CACHE_DIR = os.getenv("BOOK_CATALOG_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog_cache"))
+# Persistent embedding store shared across restarts (and replicas, if on a shared volume)
+EMBEDDING_DIR = os.getenv("BOOK_EMBEDDING_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "embeddings"))
+EMBEDDING_DTYPE = os.getenv("BOOK_EMBEDDING_DTYPE", "float16")  # "float16" or "int8"
+# Vector index backend ("exact", "ivf" or "hnsw") and its recall/latency knob
+INDEX_BACKEND = os.getenv("BOOK_INDEX_BACKEND", "ivf")
+INDEX_PARAMS = {"ivf": {"nprobe": int(os.getenv("BOOK_INDEX_NPROBE", "8"))},
+                "hnsw": {"ef": int(os.getenv("BOOK_INDEX_EF", "64"))}}.get(INDEX_BACKEND, {})
 
 # Load dataset
 @st.cache_data
 def load_data():
-    books_df = pd.read_csv('goodbooks-10k.csv')
+    books_df = load_catalog('goodbooks-10k.csv', CATALOG_CACHE_DIR)
     books_df = books_df.dropna(subset=['title', 'genres', 'description'])
-    books_df = books_df[['title', 'genres', 'author', 'description', 'average_rating']]
+    books_df = books_df[['title', 'genres', 'author', 'description', 'average_rating', 'Language', 'PublishYear']]
     return books_df
 
 books_df = load_data()
@@ -16,27 +31,50 @@ books_df = load_data()
 # Load pre-trained model
 @st.cache_resource
 def load_model():
-    return SentenceTransformer('paraphrase-MiniLM-L6-v2')
+    return SentenceTransformer(MODEL_NAME)
 
 model = load_model()
 
+# Shared query encoder: batches concurrent queries and caches popular ones across sessions
+@st.cache_resource
+def load_query_encoder(_model):
+    return BatchingQueryEncoder(lambda texts: _model.encode(texts, batch_size=len(texts)),
+                                max_batch_size=32, max_wait_ms=5, cache_size=10000)
+
+query_encoder = load_query_encoder(model)
+
 # Convert book descriptions into vectors (Fix: Use `_model` instead of `model`)
+# Vectors are persisted on disk; only added or edited descriptions are re-encoded
 @st.cache_resource
 def compute_embeddings(_model, books_df):
-    return _model.encode(books_df['description'].tolist(), convert_to_tensor=True)
+    store = EmbeddingStore(EMBEDDING_DIR, MODEL_NAME, dtype=EMBEDDING_DTYPE)
+    embeddings = store.sync(books_df['description'].tolist(), lambda texts: _model.encode(texts, batch_size=64))
+    return embeddings, store.fingerprint
 
-book_embeddings = compute_embeddings(model, books_df)
+book_embeddings, embeddings_fingerprint = compute_embeddings(model, books_df)
+
+# Build (or load) the nearest-neighbour index saved next to the embeddings
+@st.cache_resource
+def load_index(_book_embeddings, fingerprint):
+    return load_or_build_index(_book_embeddings, EMBEDDING_DIR, backend=INDEX_BACKEND, fingerprint=fingerprint, **INDEX_PARAMS)
+
+book_index = load_index(book_embeddings, embeddings_fingerprint)
+
+# Precompute genre/language bitmaps and sorted rating/year indexes for filtered search
+@st.cache_resource
+def load_filters(books_df):
+    return CatalogFilters(books_df)
+
+catalog_filters = load_filters(books_df)
 
 # Function to get book recommendations
-def get_recommendations(user_input, books_df, book_embeddings, model, top_n=5):
-    query_embedding = model.encode([user_input], convert_to_tensor=True)
-    similarities = util.pytorch_cos_sim(query_embedding, book_embeddings)[0]
-    top_results = torch.topk(similarities, k=top_n)
-
-    results = []
-    for score, book_idx in zip(top_results[0], top_results[1]):
-        results.append(f"📖 {books_df.iloc[int(book_idx)]['title']} - ⭐ {books_df.iloc[int(book_idx)]['average_rating']} (Score: {score:.4f})")
-    
+# `mask` (from CatalogFilters.mask) restricts the search to matching books
+def get_recommendations(user_input, books_df, book_index, query_encoder, top_n=5, mask=None):
+    query_embedding = query_encoder.encode(user_input)
+    scores, book_indices = book_index.search(query_embedding, k=top_n, mask=mask)
+
+    results = books_df.iloc[book_indices][['title', 'average_rating']].copy()
+    results['score'] = scores
     return results
 
 # Streamlit UI
@@ -46,10 +84,33 @@ st.subheader("Find books similar to your favorites using AI!")
 # User input
 user_input = st.text_input("Enter a book title or describe your preferences:", "")
 
+# Optional filters
+with st.expander("🔎 Filters"):
+    selected_genres = st.multiselect("Genres", sorted(catalog_filters.genres))
+    selected_languages = st.multiselect("Languages", sorted(catalog_filters.languages))
+    min_rating = st.slider("Minimum average rating", 0.0, 5.0, 0.0, 0.5)
+    year_values = catalog_filters.years[0]
+    min_year, max_year = int(year_values[0]), int(year_values[-1])
+    year_range = st.slider("Publish year", min_year, max_year, (min_year, max_year))
+
+filter_mask = catalog_filters.mask(
+    genres=selected_genres,
+    languages=selected_languages,
+    min_rating=min_rating if min_rating > 0 else None,
+    min_year=year_range[0] if year_range[0] > min_year else None,
+    max_year=year_range[1] if year_range[1] < max_year else None,
+)
+
 if user_input:
     st.write("🔍 Searching for similar books...")
-    recommendations = get_recommendations(user_input, books_df, book_embeddings, model)
+    recommendations = get_recommendations(user_input, books_df, book_index, query_encoder, mask=filter_mask)
     
     st.write("### 📌 Recommended Books:")
-    for book in recommendations:
-        st.write(book)
+    if recommendations.empty:
+        st.write("No books match the selected filters.")
+    for title, rating, score in recommendations.itertuples(index=False):
+        st.write(f"📖 {title} - ⭐ {rating:.2f} (Score: {score:.4f})")
+
+# Query encoder counters
+with st.sidebar.expander("⚙️ Query encoder stats"):
+    st.json(query_encoder.stats())
@@ -0,0 +1,81 @@
+"""Benchmark ANN index backends against exact search.
+
+Reports build time, per-query latency and recall@k (overlap with the exact
+top-k) for each backend and recall/latency knob setting.
+
+    python benchmark_index.py                      # vectors from ./embeddings
+    python benchmark_index.py --synthetic 1000000  # random clustered vectors
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from embedding_store import load_stored_embeddings
+from vector_index import ExactIndex, INDEX_BACKENDS, normalize
+
+
+# Function to generate clustered random vectors that look roughly like sentence embeddings
+def synthetic_embeddings(n, dim=384, clusters=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    return centers[labels] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+# Function to time every query and measure overlap with the exact results
+def run_queries(index, queries, truth, k, **search_params):
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        _, ids = index.search(query, k=k, **search_params)
+        latencies.append(time.perf_counter() - start)
+        hits += len(set(ids.tolist()) & expected)
+    latencies = np.array(latencies) * 1000
+    return hits / (k * len(queries)), np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "embeddings"),
+                        help="embedding store directory written by the app")
+    parser.add_argument("--synthetic", type=int, default=0, help="use N synthetic vectors instead of the stored embeddings")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128])
+    args = parser.parse_args()
+
+    if args.synthetic:
+        embeddings = synthetic_embeddings(args.synthetic)
+    else:
+        embeddings = np.asarray(load_stored_embeddings(args.embeddings), dtype=np.float32)
+    print(f"{len(embeddings)} vectors, dim {embeddings.shape[1]}, k={args.k}, {args.queries} queries")
+
+    rng = np.random.default_rng(1)
+    queries = embeddings[rng.choice(len(embeddings), args.queries, replace=False)]
+    queries = normalize(queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32))
+
+    exact = ExactIndex().build(embeddings)
+    truth = [set(exact.search(q, k=args.k)[1].tolist()) for q in queries]
+    recall, p50, p99 = run_queries(exact, queries, truth, args.k)
+    print(f"{'backend':<8} {'knob':<12} {'build s':>8} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    print(f"{'exact':<8} {'-':<12} {0:>8.2f} {recall:>9.3f} {p50:>8.3f} {p99:>8.3f}")
+
+    for backend, knob, values in (("ivf", "nprobe", args.nprobe), ("hnsw", "ef", args.ef)):
+        start = time.perf_counter()
+        try:
+            index = INDEX_BACKENDS[backend]().build(embeddings)
+        except ImportError as e:
+            print(f"{backend:<8} skipped: {e}")
+            continue
+        build_seconds = time.perf_counter() - start
+        for value in values:
+            recall, p50, p99 = run_queries(index, queries, truth, args.k, **{knob: value})
+            print(f"{backend:<8} {f'{knob}={value}':<12} {build_seconds:>8.2f} {recall:>9.3f} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+
+class CatalogFilters:
+    """Precomputed indexes for pre-filtering the catalog before similarity search.
+
+    Categorical columns (genres, language) get one boolean bitmap per value;
+    ``genres`` may hold several comma-separated values per book. Numeric
+    columns (publish year, average rating) are kept as sorted value/row arrays,
+    so a range filter is two binary searches. ``mask`` combines any of these
+    into one boolean array aligned with the catalog rows (and the embeddings).
+    """
+
+    def __init__(self, books_df):
+        self.size = len(books_df)
+        self.genres = self._bitmaps(books_df["genres"], multi_valued=True)
+        self.languages = self._bitmaps(books_df["Language"])
+        self.years = self._sorted_index(books_df["PublishYear"])
+        self.ratings = self._sorted_index(books_df["average_rating"])
+
+    # Function to build one boolean bitmap per distinct value
+    def _bitmaps(self, column, multi_valued=False):
+        values = column.astype("string").fillna("")
+        if multi_valued:
+            values = values.str.split(",")
+        else:
+            values = values.map(lambda v: [v])
+        # Row position of every (row, value) pair; the frame index may not be 0..n-1
+        positions = np.repeat(np.arange(self.size), values.map(len).to_numpy())
+        labels = values.explode().str.strip().to_numpy(dtype=object)
+        keep = labels != ""
+        codes, uniques = pd.factorize(labels[keep])
+        positions = positions[keep]
+        bitmaps = {}
+        for code, label in enumerate(uniques):
+            bitmap = np.zeros(self.size, dtype=bool)
+            bitmap[positions[codes == code]] = True
+            bitmaps[label] = bitmap
+        return bitmaps
+
+    # Function to sort a numeric column once; unparseable values are left out of every range
+    def _sorted_index(self, column):
+        values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        valid = np.flatnonzero(~np.isnan(values))
+        order = valid[np.argsort(values[valid], kind="stable")]
+        return values[order], order
+
+    def _range_mask(self, index, low=None, high=None):
+        sorted_values, order = index
+        start = 0 if low is None else np.searchsorted(sorted_values, low, side="left")
+        stop = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side="right")
+        mask = np.zeros(self.size, dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def _any_of(self, bitmaps, wanted):
+        mask = np.zeros(self.size, dtype=bool)
+        for value in wanted:
+            if value in bitmaps:
+                mask |= bitmaps[value]
+        return mask
+
+    def mask(self, genres=None, languages=None, min_rating=None, max_rating=None, min_year=None, max_year=None):
+        """Boolean row mask for the given filters, or None when no filter is set.
+
+        Values within ``genres``/``languages`` are OR-ed; the filters are AND-ed.
+        """
+        masks = []
+        if genres:
+            masks.append(self._any_of(self.genres, genres))
+        if languages:
+            masks.append(self._any_of(self.languages, languages))
+        if min_rating is not None or max_rating is not None:
+            masks.append(self._range_mask(self.ratings, min_rating, max_rating))
+        if min_year is not None or max_year is not None:
+            masks.append(self._range_mask(self.years, min_year, max_year))
+        if not masks:
+            return None
+        return np.logical_and.reduce(masks)
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import uuid
+
+import numpy as np
+
+# Bump when the on-disk layout changes so old stores are rebuilt instead of misread
+STORE_VERSION = 2
+
+SUPPORTED_DTYPES = ("float16", "int8")
+
+
+# Function to hash one row's content (the text that gets embedded)
+def row_hash(text):
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+# Function to read a store's manifest, returning None when it is missing or unreadable
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Function to open whatever a store directory currently holds as float32 (e.g. for benchmarks)
+def load_stored_embeddings(directory):
+    manifest = _read_manifest(directory)
+    if manifest is None or manifest.get("version") != STORE_VERSION:
+        raise FileNotFoundError(f"No embedding store in {directory}")
+    vectors = EmbeddingStore(directory, manifest["model"], manifest["dtype"])._open(manifest)
+    if vectors is None:
+        raise FileNotFoundError(f"The embedding store in {directory} is incomplete")
+    return vectors
+
+
+class EmbeddingStore:
+    """On-disk, memory-mapped store of sentence embeddings keyed by row content hash.
+
+    Layout inside ``directory``:
+      - ``manifest.json``: version, model name, dtype, dimension, generation and the row hashes in order
+      - ``embeddings-<generation>.npy``: (rows, dim) float16 or int8 array, opened with ``mmap_mode="r"``
+      - ``scales-<generation>.npy``: per-row float32 scales, only for int8 stores
+
+    Each write puts its data files under a new generation and then swaps the
+    manifest, so the manifest only ever names files written alongside its hashes.
+    """
+
+    def __init__(self, directory, model_name, dtype="float16"):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype {dtype!r}, expected one of {SUPPORTED_DTYPES}")
+        self.directory = directory
+        self.model_name = model_name
+        self.dtype = dtype
+        self.last_encoded = 0
+        self.fingerprint = None
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, "manifest.json")
+
+    def embeddings_path(self, generation):
+        return os.path.join(self.directory, f"embeddings-{generation}.npy")
+
+    def scales_path(self, generation):
+        return os.path.join(self.directory, f"scales-{generation}.npy")
+
+    # Function to read the manifest, returning None when it is missing or from another model/version
+    def _load_manifest(self):
+        manifest = _read_manifest(self.directory)
+        if (manifest is None
+                or manifest.get("version") != STORE_VERSION
+                or manifest.get("model") != self.model_name
+                or manifest.get("dtype") != self.dtype):
+            return None
+        return manifest
+
+    # Function to open the stored vectors as float32, memory-mapped where possible
+    def _open(self, manifest):
+        try:
+            stored = np.load(self.embeddings_path(manifest["generation"]), mmap_mode="r")
+            scales = np.load(self.scales_path(manifest["generation"]), mmap_mode="r") if self.dtype == "int8" else None
+        except (OSError, ValueError):
+            return None
+        if stored.shape[0] != len(manifest["hashes"]):
+            return None
+        if scales is not None:
+            return stored.astype(np.float32) * scales[:, None]
+        return stored
+
+    # Function to quantize float32 vectors into the store's dtype
+    def _quantize(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            return quantized, scales.astype(np.float32)
+        return vectors.astype(np.float16), None
+
+    # Function to write a new generation of data files, then point the manifest at it with one rename
+    def _write(self, hashes, quantized, scales, dim):
+        os.makedirs(self.directory, exist_ok=True)
+        previous = _read_manifest(self.directory)
+        # Unique per write, so concurrent writers never share a file and a crash leaves the old manifest valid
+        generation = uuid.uuid4().hex
+        out = np.lib.format.open_memmap(self.embeddings_path(generation), mode="w+", dtype=quantized.dtype,
+                                        shape=quantized.shape)
+        out[:] = quantized
+        out.flush()
+        del out
+        if scales is not None:
+            np.save(self.scales_path(generation), scales)
+
+        manifest = {
+            "version": STORE_VERSION,
+            "model": self.model_name,
+            "dtype": self.dtype,
+            "dim": int(dim),
+            "generation": generation,
+            "hashes": hashes,
+        }
+        tmp_manifest = f"{self.manifest_path}.{generation}.tmp"
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest, self.manifest_path)
+
+        # The replaced generation is no longer referenced; a reader still mapping it keeps its open file
+        if previous and previous.get("generation"):
+            for path in (self.embeddings_path(previous["generation"]), self.scales_path(previous["generation"])):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def sync(self, texts, encode):
+        """Return a (len(texts), dim) array of embeddings for ``texts``.
+
+        ``encode`` is called with a list of strings and must return a 2-D array.
+        Rows whose content hash is already stored are reused; only added or
+        edited rows are passed to ``encode``. When nothing changed the stored
+        array is returned memory-mapped and ``encode`` is never called.
+        """
+        texts = [str(t) for t in texts]
+        hashes = [row_hash(t) for t in texts]
+        self.last_encoded = 0
+        # Identifies this exact set of vectors, so derived artifacts (e.g. ANN indexes) can detect staleness
+        self.fingerprint = row_hash("\n".join([self.model_name, self.dtype] + hashes))
+
+        manifest = self._load_manifest()
+        existing = self._open(manifest) if manifest else None
+        if existing is not None and manifest["hashes"] == hashes:
+            return existing
+
+        old_positions = {}
+        if existing is not None:
+            for position, h in enumerate(manifest["hashes"]):
+                old_positions.setdefault(h, position)
+
+        # Encode each missing hash once, even if the text appears on several rows
+        missing = {}
+        for i, h in enumerate(hashes):
+            if h not in old_positions and h not in missing:
+                missing[h] = i
+        new_vectors = None
+        if missing:
+            new_vectors = np.asarray(encode([texts[i] for i in missing.values()]), dtype=np.float32)
+            self.last_encoded = len(missing)
+
+        if new_vectors is not None:
+            dim = new_vectors.shape[1]
+        elif existing is not None:
+            dim = existing.shape[1]
+        else:
+            dim = 0
+        combined = np.empty((len(texts), dim), dtype=np.float32)
+        new_positions = {h: j for j, h in enumerate(missing)}
+        reused = [i for i, h in enumerate(hashes) if h in old_positions]
+        if reused:
+            combined[reused] = existing[[old_positions[hashes[i]] for i in reused]]
+        fresh = [i for i, h in enumerate(hashes) if h not in old_positions]
+        if fresh:
+            combined[fresh] = new_vectors[[new_positions[hashes[i]] for i in fresh]]
+
+        quantized, scales = self._quantize(combined)
+        # Drop the old mapping before its files are removed
+        del existing
+        self._write(hashes, quantized, scales, dim)
+        return self._open(self._load_manifest())
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# Bump when parsing rules or dtypes change so existing caches are rebuilt
+INGEST_VERSION = 1
+
+# Explicit dtypes for the typed catalog; nullable integers where the raw data can be corrupted
+CATALOG_DTYPES = {
+    "title": "string",
+    "author": "string",
+    "description": "string",
+    "ISBN": "string",
+    "genres": "category",
+    "Publisher": "category",
+    "Language": "category",
+    "average_rating": "float32",
+    "rating": "float32",
+    "pagesNumber": "Int32",
+    "CountsOfReview": "Int32",
+    "PublishYear": "Int16",
+    "PublishMonth": "Int8",
+    "PublishDay": "Int8",
+    "RatingDist2": "Int32",
+    "RatingDist3": "Int32",
+    "RatingDist4": "Int32",
+    "RatingDist5": "Int32",
+    "RatingDistTotal": "Int32",
+}
+
+
+# Function to hash the source file in blocks (used as the cache key)
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Function to parse "<prefix>:<count>" cells such as "4:556485" or "total:2298124"
+def parse_prefixed_count(column, prefix):
+    values = column.astype("string").str.strip()
+    counts = values.str.extract(rf"^{prefix}:(\d+)$", expand=False)
+    return pd.to_numeric(counts, errors="coerce").astype("Int32")
+
+
+# Function to parse average_rating, falling back to `rating` where the value is corrupted
+def parse_average_rating(average_rating, rating):
+    parsed = pd.to_numeric(average_rating, errors="coerce")
+    corrupted = parsed.isna() | (parsed < 0) | (parsed > 5)
+    return parsed.mask(corrupted, pd.to_numeric(rating, errors="coerce")).astype("float32")
+
+
+def parse_catalog(raw_df):
+    """Turn the raw goodbooks CSV frame into a compact, explicitly typed frame."""
+    df = raw_df.copy()
+    for star in (2, 3, 4, 5):
+        column = f"RatingDist{star}"
+        if column in df.columns:
+            df[column] = parse_prefixed_count(df[column], star)
+    if "RatingDistTotal" in df.columns:
+        df["RatingDistTotal"] = parse_prefixed_count(df["RatingDistTotal"], "total")
+    if "average_rating" in df.columns and "rating" in df.columns:
+        df["average_rating"] = parse_average_rating(df["average_rating"], df["rating"])
+
+    for column, dtype in CATALOG_DTYPES.items():
+        if column not in df.columns:
+            continue
+        if dtype.startswith(("Int", "float")):
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(dtype)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def load_catalog(csv_path, cache_dir):
+    """Load the typed catalog, reusing the Parquet cache while the CSV's hash is unchanged."""
+    source_hash = file_hash(csv_path)
+    cache_path = os.path.join(cache_dir, "catalog.parquet")
+    manifest_path = os.path.join(cache_dir, "catalog.json")
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("source_sha256") == source_hash and manifest.get("version") == INGEST_VERSION:
+            return pd.read_parquet(cache_path)
+    except (OSError, ValueError):
+        pass
+
+    df = parse_catalog(pd.read_csv(csv_path, dtype=str, keep_default_na=True))
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": INGEST_VERSION, "source_sha256": source_hash, "rows": len(df),
+                   "dtypes": {column: str(dtype) for column, dtype in df.dtypes.items()}}, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return df
@@ -0,0 +1,73 @@
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from model_runtime import MicroBatcher
+
+
+# Function to normalize query text into a cache key (case and whitespace insensitive)
+def normalize_query(text):
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+
+class BatchingQueryEncoder:
+    """Shared front end for query encoding, safe to call from many sessions at once.
+
+    Concurrent ``encode`` calls are batched by a ``MicroBatcher``: one worker
+    thread waits for the first query, then keeps collecting for up to
+    ``max_wait_ms`` or until ``max_batch_size`` queries are pending. Results
+    are kept in a bounded LRU cache keyed on the normalized text, and identical
+    queries already waiting in the queue share one encoding.
+    """
+
+    def __init__(self, encode_batch, max_batch_size=32, max_wait_ms=5, cache_size=10000):
+        self.encode_batch = encode_batch
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._batcher = MicroBatcher(self._encode, max_batch_size, max_wait_ms, name="query-encoder")
+
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, text, timeout=None):
+        """Return the embedding (1-D float32 array) for one query."""
+        key = normalize_query(text)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            # Submitted under the lock, so a query is never encoded again just after its result was cached
+            future = self._batcher.submit(key, key)
+        return future.result(timeout=timeout)
+
+    def _encode(self, batch):
+        keys = [key for key, _ in batch]
+        vectors = np.asarray(self.encode_batch(keys), dtype=np.float32)
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._cache[key] = vector
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(zip(keys, vectors))
+
+    def stats(self):
+        """Counters for monitoring: cache hit rate and batch sizes."""
+        batching = self._batcher.stats()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_hit_rate": self.hits / lookups if lookups else 0.0,
+                "cache_entries": len(self._cache),
+                "batches": batching["batches"],
+                "queries_encoded": batching["processed"],
+                "avg_batch_size": batching["avg_batch_size"],
+                "max_batch_size": batching["max_batch_size"],
+            }
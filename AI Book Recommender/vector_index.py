@@ -0,0 +1,287 @@
+import json
+import os
+
+import numpy as np
+
+
+# Function to L2-normalize rows so inner product == cosine similarity
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# Function to pick the k best (score, id) pairs out of a candidate set, best first
+def _top_k(scores, ids, k):
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return scores[best], ids[best]
+
+
+class ExactIndex:
+    """Brute-force cosine search over every vector. Used as the recall baseline."""
+
+    name = "exact"
+    search_params = ()
+
+    def __init__(self):
+        self.vectors = None
+
+    def build(self, embeddings):
+        self.vectors = normalize(embeddings)
+        return self
+
+    def __len__(self):
+        return 0 if self.vectors is None else len(self.vectors)
+
+    def search(self, query, k=5, mask=None):
+        query = normalize(query)[0]
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+            return _top_k(self.vectors[rows] @ query, rows, k)
+        scores = self.vectors @ query
+        return _top_k(scores, np.arange(len(scores)), k)
+
+    def save(self, path):
+        np.save(path + ".npy", self.vectors)
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        index.vectors = np.load(path + ".npy", mmap_mode="r")
+        return index
+
+
+class IVFIndex:
+    """Inverted-file index: k-means coarse quantizer plus per-list exhaustive scan.
+
+    ``nprobe`` is the recall/latency knob: the number of closest lists scanned
+    per query. ``nprobe == nlist`` is exact search; small values scan only a
+    fraction of the catalog.
+
+    With a ``mask``, rows outside it are skipped while scanning, and more lists
+    are probed until ``k`` matches are found. Filters selective enough that the
+    matching rows are fewer than a normal probe would scan are answered by
+    scoring exactly those rows instead.
+    """
+
+    name = "ivf"
+    search_params = ("nprobe",)
+
+    def __init__(self, nlist=None, nprobe=8, train_iters=10, seed=42):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iters = train_iters
+        self.seed = seed
+        self.centroids = None
+        self.vectors = None   # vectors grouped by list
+        self.ids = None       # original row id of each grouped vector
+        self.offsets = None   # list i spans vectors[offsets[i]:offsets[i + 1]]
+        self.positions = None  # inverse of ids: where row id r sits in vectors
+
+    def __len__(self):
+        return 0 if self.ids is None else len(self.ids)
+
+    # Function to run spherical k-means on a sample of the data
+    def _train(self, vectors):
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(vectors), self.nlist * 64)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, self.nlist, replace=False)].copy()
+        for _ in range(self.train_iters):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(assignment, minlength=self.nlist)
+            # Sum each cluster's members with one sorted reduceat instead of a scatter-add
+            order = np.argsort(assignment, kind="stable")
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums = np.zeros_like(centroids)
+            nonempty = counts > 0
+            sums[nonempty] = np.add.reduceat(sample[order], starts[nonempty], axis=0)
+            empty = counts == 0
+            # Re-seed empty lists from random sample points
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = normalize(sums)
+        return centroids
+
+    def build(self, embeddings):
+        vectors = normalize(embeddings)
+        n = len(vectors)
+        if self.nlist is None:
+            self.nlist = max(1, int(4 * np.sqrt(n)))
+        self.nlist = max(1, min(self.nlist, n))
+        self.centroids = self._train(vectors)
+
+        # Assign in blocks to bound the (n, nlist) score matrix
+        assignment = np.empty(n, dtype=np.int64)
+        for start in range(0, n, 65536):
+            block = vectors[start:start + 65536]
+            assignment[start:start + 65536] = np.argmax(block @ self.centroids.T, axis=1)
+
+        order = np.argsort(assignment, kind="stable")
+        self.ids = order.astype(np.int64)
+        self.vectors = vectors[order]
+        counts = np.bincount(assignment, minlength=self.nlist)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._index_positions()
+        return self
+
+    def _index_positions(self):
+        self.positions = np.empty_like(self.ids)
+        self.positions[self.ids] = np.arange(len(self.ids))
+
+    # Function to score the rows of the given lists, optionally keeping only rows in mask
+    def _scan(self, lists, query, mask):
+        spans = [np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists]
+        rows = np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+        if mask is not None:
+            rows = rows[mask[self.ids[rows]]]
+        return self.vectors[rows] @ query, self.ids[rows]
+
+    def search(self, query, k=5, nprobe=None, mask=None):
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        query = normalize(query)[0]
+
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            if len(candidates) <= len(self) * nprobe / self.nlist:
+                scores = self.vectors[self.positions[candidates]] @ query
+                return _top_k(scores, candidates, k)
+            k = min(k, len(candidates))
+
+        list_order = np.argsort(-(self.centroids @ query))
+        scores, ids = self._scan(list_order[:nprobe], query, mask)
+        # Filtered scans can come up short: widen the probe until k rows matched
+        while len(ids) < k and nprobe < self.nlist:
+            more = list_order[nprobe:nprobe * 2]
+            nprobe += len(more)
+            extra_scores, extra_ids = self._scan(more, query, mask)
+            scores = np.concatenate([scores, extra_scores])
+            ids = np.concatenate([ids, extra_ids])
+        return _top_k(scores, ids, k)
+
+    def save(self, path):
+        np.savez(path + ".npz", centroids=self.centroids, vectors=self.vectors, ids=self.ids, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path, nprobe=8):
+        data = np.load(path + ".npz")
+        index = cls(nlist=len(data["centroids"]), nprobe=nprobe)
+        index.centroids = data["centroids"]
+        index.vectors = data["vectors"]
+        index.ids = data["ids"]
+        index.offsets = data["offsets"]
+        index._index_positions()
+        return index
+
+
+class HNSWIndex:
+    """HNSW graph index backed by the optional ``hnswlib`` package.
+
+    ``ef`` is the recall/latency knob: the size of the dynamic candidate list
+    explored per query. Masked searches use hnswlib's filter callback, or score
+    the matching rows directly when there are at most ``brute_force_limit``.
+    """
+
+    name = "hnsw"
+    search_params = ("ef",)
+
+    def __init__(self, M=16, ef_construction=200, ef=64):
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("The 'hnsw' index backend requires hnswlib (pip install hnswlib)") from e
+        self._hnswlib = hnswlib
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef = ef
+        self.brute_force_limit = 20000
+        self.graph = None
+
+    def __len__(self):
+        return 0 if self.graph is None else self.graph.get_current_count()
+
+    def build(self, embeddings):
+        vectors = normalize(embeddings)
+        self.graph = self._hnswlib.Index(space="ip", dim=vectors.shape[1])
+        self.graph.init_index(max_elements=len(vectors), ef_construction=self.ef_construction, M=self.M)
+        self.graph.add_items(vectors, np.arange(len(vectors)))
+        self.graph.set_ef(self.ef)
+        return self
+
+    def search(self, query, k=5, ef=None, mask=None):
+        query = normalize(query)
+        search_filter = None
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            if len(candidates) == 0:
+                return _top_k(np.empty(0, dtype=np.float32), candidates, k)
+            if len(candidates) <= self.brute_force_limit:
+                vectors = np.asarray(self.graph.get_items(candidates), dtype=np.float32)
+                return _top_k(vectors @ query[0], candidates, k)
+            search_filter = lambda label: bool(mask[label])
+            k = min(k, len(candidates))
+        k = min(k, len(self))
+        self.graph.set_ef(max(ef or self.ef, k))
+        labels, distances = self.graph.knn_query(query, k=k, filter=search_filter)
+        # hnswlib's "ip" space returns 1 - inner product
+        return (1.0 - distances[0]).astype(np.float32), labels[0].astype(np.int64)
+
+    def save(self, path):
+        self.graph.save_index(path + ".bin")
+
+    @classmethod
+    def load(cls, path, ef=64):
+        index = cls(ef=ef)
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index.graph = index._hnswlib.Index(space="ip", dim=meta["dim"])
+        index.graph.load_index(path + ".bin")
+        index.graph.set_ef(ef)
+        return index
+
+
+INDEX_BACKENDS = {
+    "exact": ExactIndex,
+    "ivf": IVFIndex,
+    "hnsw": HNSWIndex,
+}
+
+
+def _index_path(directory, backend):
+    return os.path.join(directory, f"index_{backend}")
+
+
+def load_or_build_index(embeddings, directory, backend="ivf", fingerprint=None, **params):
+    """Load the ``backend`` index saved in ``directory``, or build and save it.
+
+    The saved index is reused only when its fingerprint (e.g. the embedding
+    store's fingerprint) and row count match ``embeddings``. ``params`` are
+    passed to the backend (``nprobe`` for IVF, ``ef`` for HNSW).
+    """
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown index backend {backend!r}, expected one of {sorted(INDEX_BACKENDS)}")
+    cls = INDEX_BACKENDS[backend]
+    path = _index_path(directory, backend)
+    search_params = {key: params[key] for key in cls.search_params if key in params}
+
+    try:
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("fingerprint") == fingerprint and meta.get("rows") == len(embeddings):
+            return cls.load(path, **search_params)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = cls(**params).build(embeddings)
+    os.makedirs(directory, exist_ok=True)
+    index.save(path)
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump({"backend": backend, "fingerprint": fingerprint, "rows": len(embeddings),
+                   "dim": int(np.shape(embeddings)[1])}, f)
+    return index
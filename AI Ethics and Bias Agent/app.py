@@ -1,11 +1,31 @@
+import hashlib
+import os
 import streamlit as st
 import joblib
-import numpy as np
 import pandas as pd
-from sklearn.metrics import accuracy_score
-from aif360.datasets import BinaryLabelDataset
-from aif360.metrics import BinaryLabelDatasetMetric
-from aif360.algorithms.preprocessing import Reweighing
+from evaluation import EvaluationRunner
+from fairness import flag_disparities
+
+TARGET = "target"  # Replace "target" with actual target column
+
+
+# Function to fingerprint an upload without reading it into a DataFrame
+def upload_hash(upload):
+    return hashlib.blake2b(upload.getbuffer(), digest_size=16).hexdigest()
+
+
+# Function to evaluate the model chunk by chunk (cached per model, dataset and settings)
+@st.cache_data(show_spinner=False, max_entries=8)
+def evaluate(_model, model_hash, _data, data_hash, protected, chunk_size, workers, max_memory_mb):
+    progress = st.progress(0.0, text="Evaluating model...")
+    total = max(_data.size, 1)
+    runner = EvaluationRunner(_model, TARGET, protected, chunk_size, workers, max_memory_mb)
+    # Progress by bytes read, since the row count is not known up front
+    result = runner.run(_data, progress=lambda rows: progress.progress(min(_data.tell() / total, 1.0),
+                                                                         text=f"Evaluated {rows:,} rows"))
+    progress.empty()
+    return result
+
 
 # 🎯 Title
 st.title("🤖 AI Ethics & Bias Agent")
@@ -21,35 +41,63 @@ if uploaded_model and uploaded_data:
     # Load model
     model = joblib.load(uploaded_model)
 
-    # Load dataset
-    df = pd.read_csv(uploaded_data)
-    st.write("📊 Sample Data Preview:", df.head())
-
-    # Extract features & labels
-    X = df.drop(columns=["target"])  # Replace "target" with actual target column
-    y = df["target"]
+    # Preview only; the full dataset is streamed in chunks below
+    preview = pd.read_csv(uploaded_data, nrows=5)
+    uploaded_data.seek(0)
+    st.write("📊 Sample Data Preview:", preview)
 
     # ✅ **Step 2: Test Model Accuracy**
-    y_pred = model.predict(X)
-    accuracy = accuracy_score(y, y_pred)
-    st.write(f"🔹 **Model Accuracy:** {accuracy:.2f}")
+    candidates = [c for c in preview.columns if c != TARGET]
+    protected = st.multiselect("Protected attributes", candidates,
+                               default=["gender"] if "gender" in candidates else [])  # Change as needed
+    with st.expander("⚙️ Evaluation settings"):
+        chunk_size = st.number_input("Rows per chunk", min_value=1_000, value=50_000, step=10_000)
+        workers = st.slider("Prediction workers", 1, os.cpu_count() or 1, min(4, os.cpu_count() or 1))
+        max_memory_mb = st.number_input("Memory cap for chunks in flight (MB)", min_value=64, value=1024, step=128)
+
+    result = evaluate(model, upload_hash(uploaded_model), uploaded_data, upload_hash(uploaded_data),
+                      tuple(protected), int(chunk_size), workers, int(max_memory_mb))
+    st.write(f"🔹 **Model Accuracy:** {result.accuracy:.2f}")
+    st.caption(f"{result.rows:,} rows in {result.chunks} chunks, {result.seconds:.1f}s "
+               f"({result.rows_per_sec:,.0f} rows/s, at most {result.max_in_flight} chunks in flight)")
+    st.write("Confusion matrix (rows: actual, columns: predicted)", result.confusion)
 
     # ✅ **Step 3: Check for Bias**
     st.subheader("📈 Fairness & Bias Analysis")
-    dataset = BinaryLabelDataset(df=df, label_names=["target"], protected_attribute_names=["gender"])  # Change as needed
-    metric = BinaryLabelDatasetMetric(dataset, privileged_groups=[{'gender': 1}], unprivileged_groups=[{'gender': 0}])
-    disparate_impact = metric.disparate_impact()
-
-    st.write(f"🔹 **Disparate Impact Score:** {disparate_impact:.2f}")
-
-    # ✅ **Step 4: Apply Bias Mitigation**
-    if disparate_impact < 0.8 or disparate_impact > 1.2:
-        st.warning("⚠️ Potential bias detected! Applying bias mitigation...")
-        reweigh = Reweighing(unprivileged_groups=[{'gender': 0}], privileged_groups=[{'gender': 1}])
-        reweighed_dataset = reweigh.fit_transform(dataset)
-        metric_after = BinaryLabelDatasetMetric(reweighed_dataset, privileged_groups=[{'gender': 1}], unprivileged_groups=[{'gender': 0}])
-        st.write(f"✅ **After mitigation, New Disparate Impact Score:** {metric_after.disparate_impact():.2f}")
-    else:
-        st.success("✅ AI model is fair and meets ethical standards.")
+    fairness = result.fairness
+    privileged = {}
+    for attribute in protected:
+        # Group values come from the accumulated counts, not a full copy of the column
+        values = sorted(fairness.group_counts([attribute]).index.dropna().tolist())
+        options = ["(compare with rest)"] + values
+        choice = st.selectbox(f"Privileged value of {attribute}", options,
+                              index=options.index(1) if 1 in values else 0)
+        if choice != "(compare with rest)":
+            privileged[attribute] = choice
+    intersections = st.checkbox("Include intersections of protected attributes", value=len(protected) > 1)
+
+    if protected:
+        # Counts were accumulated during evaluation; every attribute and intersection is re-aggregated from them
+        report = fairness.report(privileged=privileged, intersections=intersections)
+
+        for row in report[(report["reference"] == "privileged") & (report["attributes"].isin(list(privileged)))].itertuples():
+            if row.group != f"{row.attributes}={privileged[row.attributes]}":
+                st.write(f"🔹 **Disparate Impact Score ({row.group}):** {row.disparate_impact:.2f} "
+                         f"(labels: {row.label_disparate_impact:.2f})")
+        st.dataframe(report.style.format(precision=3))
+
+        # ✅ **Step 4: Apply Bias Mitigation**
+        biased = flag_disparities(report, column="label_disparate_impact")
+        biased = biased[(biased["reference"] == "privileged") & (biased["attributes"].isin(list(privileged)))]
+        if len(biased):
+            st.warning("⚠️ Potential bias detected! Applying bias mitigation...")
+            for attribute in biased["attributes"].unique():
+                # Reweighing evaluated from the group counts; no second dataset is built
+                after = fairness.reweighing_disparate_impact(attribute, privileged[attribute])
+                st.write(f"✅ **After mitigation ({attribute}), New Disparate Impact Score:** {after:.2f}")
+        elif len(flag_disparities(report)):
+            st.warning("⚠️ Some groups fall outside the 0.8–1.2 disparate impact range; see the table above.")
+        else:
+            st.success("✅ AI model is fair and meets ethical standards.")
 
 st.success("AI Bias & Fairness Analysis Complete! ✅")
\ No newline at end of file
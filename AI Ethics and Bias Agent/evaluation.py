@@ -0,0 +1,137 @@
+"""Chunked, parallel evaluation of an uploaded model over a dataset of any size.
+
+The CSV is read ``chunk_size`` rows at a time and each chunk is predicted
+on a thread pool (scikit-learn releases the GIL in most of its numeric
+work). The number of chunks in flight is capped so the feature matrices
+held at once, plus the model's working copies, stay under
+``max_memory_mb``. Accuracy, the confusion matrix and the per-group counts
+for the fairness report are accumulated chunk by chunk:
+
+    python evaluation.py model.pkl audit.csv --protected gender race --chunk-size 100000 --workers 4
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import joblib
+import pandas as pd
+
+from fairness import FairnessAccumulator
+
+# Prediction typically needs a few working copies of the feature chunk
+MODEL_MEMORY_FACTOR = 3
+
+
+@dataclass
+class EvaluationResult:
+    rows: int = 0
+    correct: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    max_in_flight: int = 0
+    confusion: pd.DataFrame = field(default_factory=pd.DataFrame)
+    fairness: FairnessAccumulator = None
+
+    @property
+    def accuracy(self):
+        return self.correct / self.rows if self.rows else float("nan")
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def iter_chunks(source, chunk_size=50_000):
+    """Read ``source`` (path or file-like, rewound first) in DataFrame chunks."""
+    if hasattr(source, "seek"):
+        source.seek(0)
+    yield from pd.read_csv(source, chunksize=chunk_size)
+
+
+def _predict_chunk(model, chunk, target):
+    X = chunk.drop(columns=[target])
+    return chunk, model.predict(X)
+
+
+class EvaluationRunner:
+    """Streams a dataset through ``model.predict`` on a worker pool under a memory cap."""
+
+    def __init__(self, model, target="target", protected=(), chunk_size=50_000, workers=None, max_memory_mb=1024):
+        self.model = model
+        self.target = target
+        self.protected = list(protected)
+        self.chunk_size = chunk_size
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+
+    def _in_flight_limit(self, chunk):
+        # Sized from the first chunk: its in-memory footprint times the model's working copies
+        chunk_bytes = chunk.memory_usage(deep=True).sum() * MODEL_MEMORY_FACTOR
+        return max(1, min(self.workers * 2, int(self.max_memory_bytes // max(chunk_bytes, 1))))
+
+    def _accumulate(self, result, chunk, y_pred):
+        y_true = chunk[self.target].to_numpy()
+        result.rows += len(chunk)
+        result.correct += int((y_true == y_pred).sum())
+        result.chunks += 1
+        confusion = pd.crosstab(pd.Series(y_true, name="actual"), pd.Series(y_pred, name="predicted"))
+        result.confusion = confusion if result.confusion.empty else result.confusion.add(confusion, fill_value=0)
+        if result.fairness is not None:
+            result.fairness.update(chunk, y_true, y_pred)
+
+    def run(self, source, progress=None):
+        """Evaluate every row of ``source``; ``progress(rows_done)`` is called after each chunk."""
+        result = EvaluationResult(fairness=FairnessAccumulator(self.protected) if self.protected else None)
+        start = time.perf_counter()
+        pending = deque()
+        limit = None
+
+        def drain_one():
+            chunk, y_pred = pending.popleft().result()
+            self._accumulate(result, chunk, y_pred)
+            if progress is not None:
+                progress(result.rows)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for chunk in iter_chunks(source, self.chunk_size):
+                if limit is None:
+                    limit = self._in_flight_limit(chunk)
+                # Results are consumed in order, so accumulation stays deterministic
+                while len(pending) >= limit:
+                    drain_one()
+                pending.append(pool.submit(_predict_chunk, self.model, chunk, self.target))
+                result.max_in_flight = max(result.max_in_flight, len(pending))
+            while pending:
+                drain_one()
+
+        result.seconds = time.perf_counter() - start
+        result.confusion = result.confusion.fillna(0).astype(int)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model")
+    parser.add_argument("csv")
+    parser.add_argument("--target", default="target")
+    parser.add_argument("--protected", nargs="*", default=[])
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-memory-mb", type=int, default=1024)
+    args = parser.parse_args()
+
+    runner = EvaluationRunner(joblib.load(args.model), args.target, args.protected, args.chunk_size,
+                              args.workers, args.max_memory_mb)
+    result = runner.run(args.csv)
+    print(f"{result.rows:,} rows in {result.seconds:.1f}s ({result.rows_per_sec:,.0f} rows/s), "
+          f"accuracy {result.accuracy:.4f}, at most {result.max_in_flight} chunks in flight")
+    print(result.confusion.to_string())
+    if result.fairness is not None:
+        print(result.fairness.report().to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Grouped, vectorized fairness metrics for many protected attributes at once.
+
+One ``groupby`` over the finest grouping (every protected attribute
+together) yields confusion counts per group. Every requested attribute or
+intersection is then a re-aggregation of those counts, so labels and
+predictions are scanned once however many groupings are reported. Counts
+add up across chunks, so datasets that do not fit in memory (or in one
+aif360 ``BinaryLabelDataset``) are processed chunk by chunk:
+
+    acc = FairnessAccumulator(["gender", "race"])
+    for chunk in pd.read_csv(path, chunksize=100_000):
+        acc.update(chunk, chunk["target"], model.predict(chunk.drop(columns=["target"])))
+    report = acc.report(privileged={"gender": 1, "race": 1})
+
+Metrics follow aif360's definitions (unprivileged vs. privileged):
+
+  - disparate impact            P(pred=1 | unpriv) / P(pred=1 | priv)
+  - statistical parity diff.    P(pred=1 | unpriv) - P(pred=1 | priv)
+  - equal opportunity diff.     TPR(unpriv) - TPR(priv)
+  - average odds diff.          ((FPR diff) + (TPR diff)) / 2
+  - error rate diff.            error rate(unpriv) - error rate(priv)
+  - predictive parity diff.     precision(unpriv) - precision(priv)
+  - label disparate impact      P(y=1 | unpriv) / P(y=1 | priv), the dataset metric
+
+Without a privileged value for an attribute, each group is compared with
+the rest of the population.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+COUNT_COLUMNS = ["n", "label_pos", "pred_pos", "tp", "fp"]
+FAIR_RANGE = (0.8, 1.2)  # the four-fifths rule, both directions
+
+
+class FairnessAccumulator:
+    """Confusion counts per protected-attribute group, accumulated over any number of chunks."""
+
+    def __init__(self, protected, favorable_label=1):
+        self.protected = list(protected)
+        self.favorable_label = favorable_label
+        self.counts = None
+
+    def update(self, features, y_true, y_pred, sample_weight=None):
+        """Add one chunk; ``features`` must contain the protected columns."""
+        y = np.asarray(y_true) == self.favorable_label
+        p = np.asarray(y_pred) == self.favorable_label
+        w = np.ones(len(y)) if sample_weight is None else np.asarray(sample_weight, dtype=float)
+        frame = pd.DataFrame({column: np.asarray(features[column]) for column in self.protected})
+        frame["n"] = w
+        frame["label_pos"] = w * y
+        frame["pred_pos"] = w * p
+        frame["tp"] = w * (y & p)
+        frame["fp"] = w * (~y & p)
+        counts = frame.groupby(self.protected, dropna=False, sort=False)[COUNT_COLUMNS].sum()
+        self.counts = counts if self.counts is None else self.counts.add(counts, fill_value=0)
+        return self
+
+    def groupings(self, intersections=True):
+        """Single attributes, plus every combination of them when ``intersections`` is set."""
+        sizes = range(1, len(self.protected) + 1) if intersections else [1]
+        return [list(combo) for size in sizes for combo in combinations(self.protected, size)]
+
+    def group_counts(self, attributes):
+        return self.counts.groupby(level=attributes, dropna=False, sort=True).sum()
+
+    def report(self, privileged=None, intersections=True, min_group_size=1):
+        """One row per (grouping, group) with its rates and its metrics against the reference group."""
+        if self.counts is None:
+            raise ValueError("No data: call update() first")
+        privileged = privileged or {}
+        total = self.counts.sum()
+        frames = []
+        for attributes in self.groupings(intersections):
+            counts = self.group_counts(attributes)
+            counts = counts[counts["n"] >= min_group_size]
+            if all(a in privileged for a in attributes):
+                # Reference: the privileged combination (same for every group in this grouping)
+                key = tuple(privileged[a] for a in attributes)
+                key = key[0] if len(key) == 1 else key
+                ref = counts.loc[[key]].sum() if key in counts.index else pd.Series(np.nan, index=COUNT_COLUMNS)
+                reference = pd.DataFrame([ref.to_numpy()] * len(counts), index=counts.index, columns=COUNT_COLUMNS)
+                reference_name = "privileged"
+            else:
+                # Reference: everyone outside the group
+                reference = total.to_numpy() - counts
+                reference_name = "rest"
+            frame = _compare(counts, reference)
+            frame.insert(0, "reference", reference_name)
+            frame.insert(0, "group", [_group_label(attributes, key) for key in counts.index])
+            frame.insert(0, "attributes", " × ".join(attributes))
+            frames.append(frame.reset_index(drop=True))
+        return pd.concat(frames, ignore_index=True)
+
+    def reweighing_disparate_impact(self, attribute, privileged_value):
+        """Label disparate impact after aif360-style reweighing, computed from the counts alone.
+
+        Reweighing gives each (group, label) cell the weight P(group) * P(label) / P(group, label);
+        no second dataset is built.
+        """
+        counts = self.group_counts([attribute])
+        n, pos = counts["n"], counts["label_pos"]
+        total_n, total_pos = n.sum(), pos.sum()
+        weight_pos = (n / total_n) * (total_pos / total_n) / (pos / total_n)
+        weight_neg = (n / total_n) * ((total_n - total_pos) / total_n) / ((n - pos) / total_n)
+        weighted_pos = (pos * weight_pos).fillna(0)
+        weighted_n = weighted_pos + ((n - pos) * weight_neg).fillna(0)
+        rate = weighted_pos / weighted_n
+        unprivileged = rate.index != privileged_value
+        priv_rate = rate.get(privileged_value, np.nan)
+        unpriv_rate = weighted_pos[unprivileged].sum() / weighted_n[unprivileged].sum()
+        return unpriv_rate / priv_rate
+
+
+def _rates(counts):
+    n, label_pos, pred_pos, tp, fp = (counts[c].to_numpy(dtype=float) for c in COUNT_COLUMNS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fn = label_pos - tp
+        tn = n - label_pos - fp
+        return {
+            "base_rate": label_pos / n,
+            "selection_rate": pred_pos / n,
+            "tpr": tp / label_pos,
+            "fpr": fp / (n - label_pos),
+            "precision": tp / pred_pos,
+            "error_rate": (fp + fn) / n,
+            "accuracy": (tp + tn) / n,
+        }
+
+
+def _compare(counts, reference):
+    group, ref = _rates(counts), _rates(reference)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = {
+            "size": counts["n"].to_numpy(),
+            **group,
+            "disparate_impact": group["selection_rate"] / ref["selection_rate"],
+            "statistical_parity_difference": group["selection_rate"] - ref["selection_rate"],
+            "equal_opportunity_difference": group["tpr"] - ref["tpr"],
+            "average_odds_difference": ((group["fpr"] - ref["fpr"]) + (group["tpr"] - ref["tpr"])) / 2,
+            "error_rate_difference": group["error_rate"] - ref["error_rate"],
+            "predictive_parity_difference": group["precision"] - ref["precision"],
+            "label_disparate_impact": group["base_rate"] / ref["base_rate"],
+        }
+    return pd.DataFrame(metrics)
+
+
+def _group_label(attributes, key):
+    values = key if isinstance(key, tuple) else (key,)
+    return ", ".join(f"{a}={v}" for a, v in zip(attributes, values))
+
+
+# Function to flag groups outside the fair range of disparate impact
+def flag_disparities(report, column="disparate_impact", fair_range=FAIR_RANGE):
+    values = report[column]
+    return report[(values < fair_range[0]) | (values > fair_range[1])]
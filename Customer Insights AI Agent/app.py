@@ -1,11 +1,33 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from textblob import TextBlob
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-import joblib
+import os
+from sentiment import PolarityCache
+from segmentation import load_model
+from pipeline import ResultCache, file_signature, upload_hash, parse_stage, sentiment_stage, segmentation_stage, trends_stage
+
+# Polarity cache keyed by review hash, shared across uploads and sessions
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "sentiment_cache.sqlite")
+
+@st.cache_resource
+def load_polarity_cache():
+    return PolarityCache(SENTIMENT_CACHE_PATH)
+
+MODEL_PATH = "customer_segmentation.pkl"
+FEATURES = ["age", "income", "spending_score"]  # Modify based on dataset
+# Large file mode reads the upload in chunks of this many rows
+CHUNK_SIZE = 100_000
+# Default on above 50 MB, or a quarter of the upload limit (server.maxUploadSize, in MB) if that is lower
+LARGE_FILE_BYTES = min(50, st.get_option("server.maxUploadSize") // 4) * 1024 * 1024
+# Stage results keyed by upload hash + parameters, so reruns skip unchanged work
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", ".insights_cache")
+
+@st.cache_resource
+def load_result_cache():
+    return ResultCache(RESULT_CACHE_DIR)
+
+# Function to check the saved model once per file version instead of unpickling it on every rerun
+@st.cache_data(show_spinner=False)
+def saved_model_usable(path, signature):
+    return load_model(path) is not None
 
 # 🎯 **Customer Insights Agent**
 st.title("📊 Customer Insights Agent")
@@ -15,42 +37,38 @@ st.write("Analyze customer sentiment, market segmentation, and behavioral trends
 uploaded_file = st.file_uploader("Upload Customer Data (CSV)", type=["csv"])
 
 if uploaded_file:
-    # Load dataset
-    df = pd.read_csv(uploaded_file)
+    large_file = st.checkbox("🗂️ Large file mode (process the CSV in chunks)", value=uploaded_file.size > LARGE_FILE_BYTES)
+    # Only offer reuse for a model saved by this app; an older raw KMeans pickle is retrained instead
+    reuse_model = os.path.exists(MODEL_PATH) and saved_model_usable(MODEL_PATH, file_signature(MODEL_PATH)) and st.checkbox("♻️ Score with the saved segmentation model (no retraining)")
+    n_segments = st.slider("Number of segments", 2, 10, 3, disabled=reuse_model)
+
+    result_cache = load_result_cache()
+    data_hash = upload_hash(uploaded_file)
+
+    # Load dataset (only a preview in large file mode)
+    df = parse_stage(result_cache, uploaded_file, data_hash, large_file)
     st.write("📊 Sample Data Preview:", df.head())
 
     # ✅ **Step 2: Sentiment Analysis on Customer Reviews**
     if "review" in df.columns:
         st.subheader("💬 Sentiment Analysis on Customer Reviews")
-        df["Sentiment"] = df["review"].apply(lambda x: TextBlob(str(x)).sentiment.polarity)
-        df["Sentiment Label"] = df["Sentiment"].apply(lambda x: "Positive" if x > 0.2 else ("Negative" if x < -0.2 else "Neutral"))
+        sentiment_counts = sentiment_stage(result_cache, uploaded_file, data_hash, large_file, load_polarity_cache(), CHUNK_SIZE)
 
         # Show sentiment distribution
-        sentiment_counts = df["Sentiment Label"].value_counts()
         st.bar_chart(sentiment_counts)
 
     # ✅ **Step 3: Market Segmentation (K-Means Clustering)**
     st.subheader("📌 Market Segmentation")
-    features = ["age", "income", "spending_score"]  # Modify based on dataset
-    if all(col in df.columns for col in features):
-        X = df[features]
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-
-        # Apply K-Means clustering
-        kmeans = KMeans(n_clusters=3, random_state=42)
-        df["Segment"] = kmeans.fit_predict(X_scaled)
+    if all(col in df.columns for col in FEATURES):
+        segment_distribution = segmentation_stage(result_cache, uploaded_file, data_hash, large_file, FEATURES,
+                                                  n_segments, MODEL_PATH, reuse_model, CHUNK_SIZE)
 
         # Show segment distribution
-        segment_counts = df["Segment"].value_counts()
-        st.bar_chart(segment_counts)
-
-        # Save model
-        joblib.dump(kmeans, "customer_segmentation.pkl")
+        st.bar_chart(segment_distribution)
 
     # ✅ **Step 4: Consumer Behavior Trends**
     st.subheader("📈 Consumer Behavior Trends")
     if "purchase_frequency" in df.columns:
-        st.line_chart(df.groupby("age")["purchase_frequency"].mean())
+        st.line_chart(trends_stage(result_cache, uploaded_file, data_hash, large_file, CHUNK_SIZE))
 
     st.success("✅ Customer Insights Analysis Complete!")
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""Cached analysis stages for the Customer Insights app.
+
+Streamlit reruns the whole script on every widget interaction. Each stage
+here (parse, sentiment, segmentation, trends) is keyed by a hash of the
+uploaded bytes plus the stage's parameters. A rerun with nothing changed is
+served from ``ResultCache`` (a bounded in-memory LRU backed by a bounded disk
+directory) instead of being recomputed.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from segmentation import SegmentationModel, fit_streaming, iter_chunks, load_model, segment_counts
+from sentiment import SENTIMENT_LABELS, label_sentiment, score_reviews
+
+# Bump when a stage's output changes so stale cached results are not served
+PIPELINE_VERSION = 1
+
+
+# Function to hash the uploaded bytes without copying them
+def upload_hash(uploaded_file):
+    return hashlib.blake2b(uploaded_file.getbuffer(), digest_size=20).hexdigest()
+
+
+# Function to identify a file on disk cheaply (for params that depend on e.g. a saved model)
+def file_signature(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class ResultCache:
+    """Two-level LRU cache of pickled stage results, bounded by bytes at each level."""
+
+    def __init__(self, directory, max_memory_bytes=256 * 1024 * 1024, max_disk_bytes=2 * 1024 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._memory = OrderedDict()  # key -> (value, size in bytes)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def key(self, stage, data_hash, params):
+        payload = json.dumps([PIPELINE_VERSION, stage, data_hash, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _remember(self, key, value, size):
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key)[1]
+            if size > self.max_memory_bytes:
+                return
+            self._memory[key] = (value, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                self._memory_bytes -= self._memory.popitem(last=False)[1][1]
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        # Least recently used first (reads bump the mtime)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get_or_compute(self, stage, data_hash, params, compute):
+        key = self.key(stage, data_hash, params)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key][0]
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            os.utime(path)
+            value = pickle.loads(payload)
+        except OSError:
+            pass
+        except (pickle.UnpicklingError, EOFError, AttributeError, ValueError, ImportError):
+            # A corrupt or legacy entry (e.g. a class that moved) is a miss; it is overwritten below
+            pass
+        else:
+            with self._lock:
+                self.stats["disk_hits"] += 1
+            self._remember(key, value, len(payload))
+            return value
+
+        with self._lock:
+            self.stats["misses"] += 1
+        value = compute()
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        self._remember(key, value, len(payload))
+        self._evict_disk()
+        return value
+
+
+# Function to load the upload: the whole frame, or just a preview in large file mode
+def parse_stage(cache, uploaded_file, data_hash, large_file):
+    def compute():
+        uploaded_file.seek(0)
+        return pd.read_csv(uploaded_file, nrows=5 if large_file else None)
+    return cache.get_or_compute("parse", data_hash, {"large_file": large_file}, compute)
+
+
+def sentiment_stage(cache, uploaded_file, data_hash, large_file, polarity_cache, chunk_size):
+    """Sentiment label counts."""
+    def compute():
+        if not large_file:
+            df = parse_stage(cache, uploaded_file, data_hash, large_file)
+            # Unique reviews only, scored in parallel chunks; previously seen reviews come from the polarity cache
+            return pd.Series(label_sentiment(score_reviews(df["review"], cache=polarity_cache))).value_counts()
+        counts = pd.Series(0, index=SENTIMENT_LABELS)
+        for chunk in iter_chunks(uploaded_file, ["review"], chunk_size):
+            labels = label_sentiment(score_reviews(chunk["review"], cache=polarity_cache))
+            counts = counts.add(pd.Series(labels).value_counts(), fill_value=0)
+        return counts.astype(int)
+    return cache.get_or_compute("sentiment", data_hash, {"large_file": large_file}, compute)
+
+
+def segmentation_stage(cache, uploaded_file, data_hash, large_file, features, n_segments, model_path, reuse_model, chunk_size):
+    """Customers per segment. A freshly trained model is saved to ``model_path`` only when actually computed."""
+    if reuse_model:
+        params = {"model": file_signature(model_path), "features": features, "large_file": large_file}
+    else:
+        params = {"n_segments": n_segments, "features": features, "large_file": large_file}
+
+    def compute():
+        # An older pickle (a bare KMeans) is not reusable; train a new model instead
+        model = load_model(model_path) if reuse_model else None
+        trained = model is None
+        if trained and large_file:
+            # Incremental scaler + mini-batch k-means, streamed over the file
+            model = fit_streaming(uploaded_file, features, n_clusters=n_segments, chunk_size=chunk_size)
+        elif trained:
+            df = parse_stage(cache, uploaded_file, data_hash, large_file)
+            scaler = StandardScaler()
+            X_scaled = scaler.fit_transform(df[features].dropna().to_numpy(dtype=float))
+            kmeans = KMeans(n_clusters=n_segments, random_state=42)
+            kmeans.fit(X_scaled)
+            model = SegmentationModel(list(features), scaler, kmeans)
+
+        if large_file:
+            counts = segment_counts(uploaded_file, model, chunk_size)
+        else:
+            segments = model.predict(parse_stage(cache, uploaded_file, data_hash, large_file))
+            # Rows with missing features are left unsegmented (-1)
+            counts = pd.Series(segments[segments >= 0]).value_counts()
+
+        # Save model (scaler + k-means, reusable for scoring new files)
+        if trained:
+            model.save(model_path)
+        return counts
+    return cache.get_or_compute("segmentation", data_hash, params, compute)
+
+
+def trends_stage(cache, uploaded_file, data_hash, large_file, chunk_size):
+    """Mean purchase frequency per age."""
+    def compute():
+        if not large_file:
+            df = parse_stage(cache, uploaded_file, data_hash, large_file)
+            return df.groupby("age")["purchase_frequency"].mean()
+        totals = None
+        for chunk in iter_chunks(uploaded_file, ["age", "purchase_frequency"], chunk_size):
+            grouped = chunk.groupby("age")["purchase_frequency"].agg(["sum", "count"])
+            totals = grouped if totals is None else totals.add(grouped, fill_value=0)
+        return (totals["sum"] / totals["count"]).sort_index()
+    return cache.get_or_compute("trends", data_hash, {"large_file": large_file}, compute)
@@ -0,0 +1,142 @@
+"""Out-of-core market segmentation for customer files of any size.
+
+The CSV is never loaded whole. Fitting takes two streaming passes:
+``StandardScaler.partial_fit``, then ``MiniBatchKMeans.partial_fit`` on the
+scaled chunks. Assigning segments is a third pass. Peak memory is bounded by
+``chunk_size`` rows. The saved model bundles the
+features, scaler and k-means, so new files can be scored without retraining:
+
+    python segmentation.py fit customers.csv --k 5 --model customer_segmentation.pkl
+    python segmentation.py score new_customers.csv --model customer_segmentation.pkl --output scored.csv
+"""
+import argparse
+from dataclasses import dataclass
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+FEATURES = ["age", "income", "spending_score"]
+
+
+@dataclass
+class SegmentationModel:
+    features: list
+    scaler: StandardScaler
+    kmeans: object  # fitted KMeans or MiniBatchKMeans
+
+    @property
+    def n_clusters(self):
+        return self.kmeans.n_clusters
+
+    def predict(self, X):
+        """Segment ids for a DataFrame (or array) holding ``features``; rows with missing values get -1."""
+        X = np.asarray(X[self.features] if isinstance(X, pd.DataFrame) else X, dtype=float)
+        segments = np.full(len(X), -1, dtype=int)
+        complete = ~np.isnan(X).any(axis=1)
+        if complete.any():
+            segments[complete] = self.kmeans.predict(self.scaler.transform(X[complete]))
+        return segments
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+
+def load_model(path):
+    """The saved ``SegmentationModel``, or None when ``path`` holds something else (e.g. an older raw KMeans pickle)."""
+    model = joblib.load(path)
+    return model if isinstance(model, SegmentationModel) else None
+
+
+def iter_chunks(source, columns=None, chunk_size=100_000):
+    """Read ``source`` (path or file-like, rewound first) in DataFrame chunks."""
+    if hasattr(source, "seek"):
+        source.seek(0)
+    yield from pd.read_csv(source, usecols=columns, chunksize=chunk_size)
+
+
+def iter_feature_chunks(source, features, chunk_size):
+    for chunk in iter_chunks(source, features, chunk_size):
+        X = chunk[features].to_numpy(dtype=float)
+        X = X[~np.isnan(X).any(axis=1)]
+        if len(X):
+            yield X
+
+
+def fit_streaming(source, features=FEATURES, n_clusters=3, chunk_size=100_000, random_state=42):
+    """Fit scaler + mini-batch k-means over ``source`` in two streaming passes."""
+    scaler = StandardScaler()
+    for X in iter_feature_chunks(source, features, chunk_size):
+        scaler.partial_fit(X)
+
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3,
+                             batch_size=min(chunk_size, 4096))
+    # partial_fit needs at least n_clusters rows in its first call, so tiny leading chunks are held back
+    pending = None
+    for X in iter_feature_chunks(source, features, chunk_size):
+        pending = X if pending is None else np.vstack([pending, X])
+        if len(pending) >= n_clusters:
+            kmeans.partial_fit(scaler.transform(pending))
+            pending = None
+    if not hasattr(kmeans, "cluster_centers_"):
+        raise ValueError(f"Need at least {n_clusters} complete rows of {features} to fit {n_clusters} segments")
+    if pending is not None:
+        kmeans.partial_fit(scaler.transform(pending))
+    return SegmentationModel(list(features), scaler, kmeans)
+
+
+def assign_segments(source, model, chunk_size=100_000, columns=None):
+    """Yield each chunk of ``source`` with a ``Segment`` column added (the assignment pass)."""
+    for chunk in iter_chunks(source, columns, chunk_size):
+        chunk["Segment"] = model.predict(chunk)
+        yield chunk
+
+
+def segment_counts(source, model, chunk_size=100_000):
+    """Customers per segment, accumulated chunk by chunk."""
+    counts = np.zeros(model.n_clusters, dtype=np.int64)
+    for chunk in assign_segments(source, model, chunk_size, columns=model.features):
+        segments = chunk["Segment"].to_numpy()
+        counts += np.bincount(segments[segments >= 0], minlength=model.n_clusters)
+    return pd.Series(counts, name="count").rename_axis("Segment")
+
+
+def write_segments(source, model, output_path, chunk_size=100_000):
+    """Score ``source`` with ``model`` and append every chunk, with its Segment, to ``output_path``."""
+    for i, chunk in enumerate(assign_segments(source, model, chunk_size)):
+        chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    fit = sub.add_parser("fit", help="train a segmentation model")
+    fit.add_argument("csv")
+    fit.add_argument("--k", type=int, default=3)
+    fit.add_argument("--features", nargs="+", default=FEATURES)
+    fit.add_argument("--model", default="customer_segmentation.pkl")
+    fit.add_argument("--chunk-size", type=int, default=100_000)
+    score = sub.add_parser("score", help="assign segments with a saved model")
+    score.add_argument("csv")
+    score.add_argument("--model", default="customer_segmentation.pkl")
+    score.add_argument("--output", required=True)
+    score.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        model = fit_streaming(args.csv, args.features, args.k, args.chunk_size)
+        model.save(args.model)
+        print(segment_counts(args.csv, model, args.chunk_size).to_string())
+    else:
+        model = load_model(args.model)
+        if model is None:
+            parser.error(f"{args.model} is not a segmentation model saved by this tool; run `fit` first")
+        write_segments(args.csv, model, args.output, args.chunk_size)
+
+
+if __name__ == "__main__":
+    # Run through the importable module so pickled models reference `segmentation`, not `__main__`
+    import segmentation
+    segmentation.main()
@@ -0,0 +1,113 @@
+import contextlib
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from textblob import TextBlob
+
+# Polarity cut-offs for the sentiment labels
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+SENTIMENT_LABELS = ["Negative", "Neutral", "Positive"]
+
+
+# Function to hash a review (cache key shared across uploads)
+def review_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _polarity_chunk(texts):
+    return [TextBlob(text).sentiment.polarity for text in texts]
+
+
+class PolarityCache:
+    """SQLite-backed review-hash -> polarity cache that persists across uploads and sessions."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS polarity (hash TEXT PRIMARY KEY, polarity REAL NOT NULL)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One transaction per use, and the connection is closed afterwards (sqlite3's own context manager only commits)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, hashes, batch_size=900):
+        found = {}
+        with self._connect() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), batch_size):
+                batch = hashes[start:start + batch_size]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(f"SELECT hash, polarity FROM polarity WHERE hash IN ({placeholders})", batch)
+                found.update(rows)
+        return found
+
+    def put_many(self, items):
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO polarity (hash, polarity) VALUES (?, ?)", items)
+
+
+def compute_polarity(texts, workers=None, chunk_size=2000):
+    """TextBlob polarity for each text, in chunks across a process pool when there is enough work."""
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(texts) <= chunk_size:
+        return _polarity_chunk(texts)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    polarity = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_polarity_chunk, chunks):
+            polarity.extend(result)
+    return polarity
+
+
+def score_reviews(reviews, cache=None, workers=None, chunk_size=2000):
+    """Polarity for every review, scoring each distinct review text at most once.
+
+    Duplicates within the upload are collapsed first; reviews already in
+    ``cache`` (a PolarityCache) are not re-scored, and new scores are added to it.
+    Returns a float array aligned with ``reviews``.
+    """
+    # str() per value, as before: missing reviews are scored as the text "nan"
+    codes, uniques = pd.factorize(pd.Series(reviews, dtype=object).map(str))
+    uniques = list(uniques)
+    polarity = np.empty(len(uniques), dtype=float)
+
+    missing = list(range(len(uniques)))
+    if cache is not None:
+        hashes = [review_hash(text) for text in uniques]
+        cached = cache.get_many(hashes)
+        missing = []
+        for i, h in enumerate(hashes):
+            if h in cached:
+                polarity[i] = cached[h]
+            else:
+                missing.append(i)
+
+    if missing:
+        scores = compute_polarity([uniques[i] for i in missing], workers, chunk_size)
+        polarity[missing] = scores
+        if cache is not None:
+            cache.put_many([(hashes[i], score) for i, score in zip(missing, scores)])
+
+    return polarity[codes]
+
+
+def label_sentiment(polarity):
+    """Vectorized Positive/Neutral/Negative labels (same cut-offs as before: > 0.2, < -0.2)."""
+    polarity = np.asarray(polarity, dtype=float)
+    bins = np.where(polarity > POSITIVE_THRESHOLD, 2, np.where(polarity < NEGATIVE_THRESHOLD, 0, 1))
+    return pd.Categorical.from_codes(bins, categories=SENTIMENT_LABELS)
@@ -0,0 +1,76 @@
+"""Scaling benchmark for the vectorized forecasting engine.
+
+Fits every model to synthetic random-walk panels of increasing size and
+compares the batched fit (all series in one call) with a per-series Python
+loop over the same model code. Reports seconds per fit, series/sec and the
+speedup, and saves the results as JSON:
+
+    python benchmark_forecasting.py --series 10 100 1000 5000 --obs 250 --horizon 20
+    python benchmark_forecasting.py --output bench.json
+"""
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from forecasting import MODELS, forecast
+
+
+# Function to generate n random walks with drift
+def synthetic_panel(n_series, n_obs, seed=0):
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.05, 1.0, size=(n_series, n_obs))
+    return 100 + np.cumsum(steps, axis=1)
+
+
+def best_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--obs", type=int, default=250)
+    parser.add_argument("--horizon", type=int, default=20)
+    parser.add_argument("--models", nargs="+", default=sorted(MODELS), choices=sorted(MODELS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--loop-limit", type=int, default=1000,
+                        help="skip the per-series loop baseline above this many series")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = []
+    for n_series in args.series:
+        panel = synthetic_panel(n_series, args.obs)
+        for model in args.models:
+            batched = best_time(lambda: forecast(panel, model, args.horizon), args.repeats)
+            row = {"model": model, "series": n_series, "obs": args.obs, "batched_s": batched,
+                   "series_per_s": n_series / batched}
+            if n_series <= args.loop_limit:
+                looped = best_time(lambda: [forecast(panel[i:i + 1], model, args.horizon) for i in range(n_series)],
+                                   args.repeats)
+                row.update({"loop_s": looped, "speedup": looped / batched})
+            results.append(row)
+            speedup = f", {row['speedup']:.0f}x vs loop" if "speedup" in row else ""
+            print(f"{model:>7} n={n_series:>6}: {batched * 1000:8.1f} ms  ({row['series_per_s']:,.0f} series/s{speedup})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "horizon": args.horizon,
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Vectorized forecasting over a panel of series (symbols, business lines, ...).
+
+Every model is fitted to all series at once. Parameters are estimated with
+batched NumPy operations over an ``(n_series, n_obs)`` array, so the cost of
+going from one series to thousands is a few larger array operations, not a
+Python loop. The only loops are over time steps (exponential smoothing
+recursion, AR forecast recursion), each vectorized across series.
+
+Models (``MODELS``):
+
+  - ``drift``   random walk with drift
+  - ``ses``     simple exponential smoothing, alpha picked per series from a grid
+  - ``linear``  least-squares linear trend
+  - ``ar``      AR(p) with intercept, fitted by batched least squares
+
+Each returns point forecasts and a normal prediction interval for every
+step of the horizon:
+
+    fc = forecast(closes, model="ses", horizon=20, level=0.95)
+    fc.to_frame()     # series, step, mean, lower, upper
+"""
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+SES_ALPHAS = np.linspace(0.05, 1.0, 20)
+
+
+@dataclass
+class Forecast:
+    names: list
+    model: str
+    level: float
+    mean: np.ndarray   # (n_series, horizon)
+    lower: np.ndarray
+    upper: np.ndarray
+
+    def to_frame(self):
+        """Long format: one row per series and step."""
+        n, horizon = self.mean.shape
+        return pd.DataFrame({
+            "series": np.repeat(self.names, horizon),
+            "step": np.tile(np.arange(1, horizon + 1), n),
+            "mean": self.mean.ravel(),
+            "lower": self.lower.ravel(),
+            "upper": self.upper.ravel(),
+        })
+
+
+# Function to turn a wide DataFrame (rows = periods, columns = series) into a complete panel
+def prepare_panel(frame, min_obs=10):
+    """Forward-fill gaps, drop series with fewer than ``min_obs`` values and trim to the common window.
+
+    Returns ``(names, values)`` with ``values`` shaped ``(n_series, n_obs)``.
+    """
+    frame = frame.sort_index().ffill()
+    frame = frame.loc[:, frame.notna().sum() >= min_obs]
+    frame = frame.dropna()
+    if frame.shape[0] < min_obs or frame.shape[1] == 0:
+        raise ValueError(f"Need at least {min_obs} common observations across the selected series")
+    return list(frame.columns), frame.to_numpy(dtype=float).T
+
+
+def _drift(Y, horizon):
+    T = Y.shape[1]
+    diffs = np.diff(Y, axis=1)
+    slope = diffs.mean(axis=1)
+    sigma = (diffs - slope[:, None]).std(axis=1, ddof=1)
+    steps = np.arange(1, horizon + 1)
+    mean = Y[:, -1:] + slope[:, None] * steps
+    # Hyndman & Athanasopoulos, random walk with drift: sigma * sqrt(h * (1 + h / (T - 1)))
+    scale = sigma[:, None] * np.sqrt(steps * (1 + steps / (T - 1)))
+    return mean, scale
+
+
+def _ses(Y, horizon, alphas=SES_ALPHAS):
+    n, T = Y.shape
+    # Run every candidate alpha for every series together: state is (n, n_alphas)
+    level = np.repeat(Y[:, :1], len(alphas), axis=1)
+    sse = np.zeros_like(level)
+    for t in range(1, T):
+        error = Y[:, t:t + 1] - level
+        sse += error ** 2
+        level += alphas * error
+    best = sse.argmin(axis=1)
+    rows = np.arange(n)
+    alpha = alphas[best]
+    sigma = np.sqrt(sse[rows, best] / (T - 1))
+    steps = np.arange(1, horizon + 1)
+    mean = np.repeat(level[rows, best][:, None], horizon, axis=1)
+    scale = sigma[:, None] * np.sqrt(1 + (steps - 1) * alpha[:, None] ** 2)
+    return mean, scale
+
+
+def _linear(Y, horizon):
+    T = Y.shape[1]
+    X = np.column_stack([np.ones(T), np.arange(T)])
+    XtX_inv = np.linalg.inv(X.T @ X)
+    # One matrix product fits every series: the design matrix is shared
+    beta = Y @ (X @ XtX_inv)
+    residuals = Y - beta @ X.T
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / (T - 2))
+    X_future = np.column_stack([np.ones(horizon), np.arange(T, T + horizon)])
+    mean = beta @ X_future.T
+    leverage = np.einsum("hi,ij,hj->h", X_future, XtX_inv, X_future)
+    scale = sigma[:, None] * np.sqrt(1 + leverage)
+    return mean, scale
+
+
+def _ar(Y, horizon, p=3):
+    n, T = Y.shape
+    if T <= 2 * p + 1:
+        raise ValueError(f"AR({p}) needs more than {2 * p + 1} observations")
+    # Lagged design per series: (n, T - p, p + 1) = [1, y[t-1], ..., y[t-p]]
+    lags = np.stack([Y[:, p - i - 1:T - i - 1] for i in range(p)], axis=2)
+    Z = np.concatenate([np.ones((n, T - p, 1)), lags], axis=2)
+    target = Y[:, p:]
+    ZtZ = np.einsum("nti,ntj->nij", Z, Z)
+    Zty = np.einsum("nti,nt->ni", Z, target)
+    ridge = 1e-10 * np.trace(ZtZ, axis1=1, axis2=2)[:, None, None] * np.eye(p + 1)
+    coef = np.linalg.solve(ZtZ + ridge, Zty[:, :, None])[:, :, 0]
+    residuals = target - np.einsum("nti,ni->nt", Z, coef)
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / max(T - p - (p + 1), 1))
+
+    intercept, phi = coef[:, 0], coef[:, 1:]
+    history = Y[:, -p:][:, ::-1].copy()  # most recent first
+    mean = np.empty((n, horizon))
+    for k in range(horizon):
+        mean[:, k] = intercept + (phi * history).sum(axis=1)
+        history = np.concatenate([mean[:, k:k + 1], history[:, :-1]], axis=1)
+
+    # MA(infinity) weights give the h-step forecast variance
+    psi = np.zeros((n, horizon))
+    psi[:, 0] = 1.0
+    for j in range(1, horizon):
+        for i in range(1, min(j, p) + 1):
+            psi[:, j] += phi[:, i - 1] * psi[:, j - i]
+    scale = sigma[:, None] * np.sqrt(np.cumsum(psi ** 2, axis=1))
+    return mean, scale
+
+
+MODELS = {"drift": _drift, "ses": _ses, "linear": _linear, "ar": _ar}
+
+
+def forecast(panel, model="ses", horizon=10, level=0.95, names=None):
+    """Forecast every series in ``panel`` (a wide DataFrame or an ``(n_series, n_obs)`` array)."""
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}; choose from {sorted(MODELS)}")
+    if isinstance(panel, pd.DataFrame):
+        names, Y = prepare_panel(panel)
+    else:
+        Y = np.atleast_2d(np.asarray(panel, dtype=float))
+        names = list(names) if names is not None else list(range(Y.shape[0]))
+    mean, scale = MODELS[model](Y, horizon)
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    return Forecast(names, model, level, mean, mean - z * scale, mean + z * scale)
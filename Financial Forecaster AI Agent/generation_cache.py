@@ -0,0 +1,169 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from model_runtime import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# Greedy decoding: the same prompt always yields the same text, so results can be cached
+DETERMINISTIC_PARAMS = {"do_sample": False}
+
+
+# Function to build the cache key for one generation
+def generation_key(model_name, prompt, params):
+    raw = json.dumps([model_name, prompt, sorted(params.items())], default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskGenerationStore:
+    """SQLite key -> generated text store, capped at ``max_entries`` (least recently used rows go first)."""
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS generations "
+                         "(key TEXT PRIMARY KEY, text TEXT NOT NULL, last_used REAL NOT NULL)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One transaction per use, and the connection is closed afterwards (sqlite3's own context manager only commits)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT text FROM generations WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE generations SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+
+    def put_many(self, items):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO generations (key, text, last_used) VALUES (?, ?, ?)",
+                             [(key, text, now) for key, text in items])
+            conn.execute("DELETE FROM generations WHERE key NOT IN "
+                         "(SELECT key FROM generations ORDER BY last_used DESC LIMIT ?)", (self.max_entries,))
+
+
+class CachedGenerator:
+    """Cached, micro-batched front end for a text-generation pipeline.
+
+    Results are cached on (model, prompt, generation parameters) in a bounded
+    in-memory LRU, optionally backed by a ``DiskGenerationStore`` so they
+    survive restarts; a repeated request is a dictionary lookup. Misses go
+    through a ``MicroBatcher``, whose worker thread generates them together:
+    requests with the same parameters go into one batched pipeline call,
+    sorted so prompts sharing a prefix sit next to each other, and identical
+    requests already queued share one generation. Decoding defaults to greedy
+    (``DETERMINISTIC_PARAMS``).
+    """
+
+    def __init__(self, pipeline, model_name, max_batch_size=8, max_wait_ms=10, cache_size=256, store=None):
+        self.pipeline = pipeline
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self.store = store
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._batcher = MicroBatcher(self._generate_batch, max_batch_size, max_wait_ms, name="generation-cache")
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, text):
+        self._cache[key] = text
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def generate(self, prompt, timeout=None, **params):
+        """Generated text for ``prompt`` (prompt included, as the pipeline returns it)."""
+        params = {**DETERMINISTIC_PARAMS, **params}
+        key = generation_key(self.model_name, prompt, params)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+
+        text = self.store.get(key) if self.store is not None else None
+        with self._lock:
+            if text is not None:
+                self.disk_hits += 1
+                self._remember(key, text)
+                return text
+            self.misses += 1
+            future = self._batcher.submit(key, (prompt, params))
+        return future.result(timeout=timeout)
+
+    def _generate_group(self, items, params):
+        # Sorted prompts put shared prefixes side by side, keeping padding within a batch small
+        items = sorted(items, key=lambda item: item[1])
+        tokenizer = getattr(self.pipeline, "tokenizer", None)
+        if len(items) > 1 and tokenizer is not None:
+            # Decoder-only models continue from the last token, so batched prompts are padded on the left
+            tokenizer.padding_side = "left"
+        outputs = self.pipeline([prompt for _, prompt in items], batch_size=len(items), **params)
+        # A list input yields one list of candidates per prompt
+        texts = [output[0]["generated_text"] if isinstance(output, list) else output["generated_text"]
+                 for output in outputs]
+        return [(key, text) for (key, _), text in zip(items, texts)]
+
+    def _generate_batch(self, batch):
+        groups = {}
+        for key, (prompt, params) in batch:
+            groups.setdefault(json.dumps(sorted(params.items()), default=str), (params, []))[1].append((key, prompt))
+
+        results = {}
+        for params, items in groups.values():
+            try:
+                texts = dict(self._generate_group(items, params))
+            except Exception as e:
+                # Only this group fails; other parameter groups in the batch still get their text
+                results.update((key, e) for key, _ in items)
+                continue
+            if self.store is not None:
+                try:
+                    self.store.put_many(list(texts.items()))
+                except Exception:
+                    # A failed disk write only costs the persisted copy; callers still get their text
+                    logger.exception("Could not persist %d generations", len(texts))
+            with self._lock:
+                for key, text in texts.items():
+                    self._remember(key, text)
+            results.update(texts)
+        return results
+
+    def stats(self):
+        """Counters for monitoring: cache hit rate and batch sizes."""
+        batching = self._batcher.stats()
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "cache_hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "cache_misses": self.misses,
+                "cache_hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "cache_entries": len(self._cache),
+                "batches": batching["batches"],
+                "generations": batching["processed"],
+                "avg_batch_size": batching["avg_batch_size"],
+            }
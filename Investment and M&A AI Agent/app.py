@@ -1,70 +1,64 @@
 import streamlit as st
 import requests
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from market_data import MarketDataClient
 
 # Load API keys from Hugging Face secrets
 ALPHA_VANTAGE_API_KEY = st.secrets["ALPHA_VANTAGE_API_KEY"]
 FRED_API_KEY = st.secrets["FRED_API_KEY"]
 FMP_API_KEY = st.secrets["FMP_API_KEY"]
 
+# Seconds allowed per upstream attempt, and retries per call; the page timeout is derived from both below
+FETCH_TIMEOUT = 5
+FETCH_RETRIES = 2
+INDICATORS = ["GDP", "UNRATE", "CPIAUCSL"]
+
+# Pooled, cached client shared by all sessions
+@st.cache_resource
+def load_market_data():
+    return MarketDataClient(alpha_vantage_key=ALPHA_VANTAGE_API_KEY, fred_key=FRED_API_KEY, fmp_key=FMP_API_KEY,
+                            timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES)
+
+# Bounded thread pool for the independent upstream calls, shared by all sessions
+@st.cache_resource
+def load_fetch_pool():
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="fetch")
+
+market_data = load_market_data()
+fetch_pool = load_fetch_pool()
+# A call that needs every retry still lands before the page gives up on it
+PAGE_TIMEOUT = round(market_data.request_budget()) + 2
+
+# Fetch functions run on worker threads, so they raise instead of calling st.error
+
 # Function to fetch company fundamentals
 def get_fundamental_data(symbol):
-    try:
-        url = f"https://www.alphavantage.co/query?function=OVERVIEW&symbol={symbol}&apikey={ALPHA_VANTAGE_API_KEY}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching data: {e}")
-        return {}
+    return market_data.overview(symbol)
 
 # Function to get economic data from FRED
 def get_economic_data(series_id):
-    try:
-        url = f"https://api.stlouisfed.org/fred/series/observations?series_id={series_id}&api_key={FRED_API_KEY}&file_type=json"
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json().get("observations", [])
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching data: {e}")
-        return []
+    return market_data.fred_observations(series_id)
 
 # Function to get company data from Financial Modeling Prep
 def get_fmp_data(symbol):
-    try:
-        url = f"https://financialmodelingprep.com/api/v3/profile/{symbol}?apikey={FMP_API_KEY}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()[0] if response.json() else {}
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching data: {e}")
-        return {}
+    return market_data.fmp_profile(symbol)
 
-# Streamlit UI
-st.title("💼 Investment & M&A Agent")
-st.markdown("AI-driven insights for strategic growth, M&A, and investments.")
-
-symbol = st.text_input("🔍 Enter Stock Symbol", value="AAPL")
-
-if symbol:
-    st.subheader("📊 Company Financial Overview")
-    fundamentals = get_fundamental_data(symbol)
+# Renderers, called on the script thread as each result arrives
+def render_fundamentals(fundamentals):
     if fundamentals:
         st.write(f"**Name:** {fundamentals.get('Name', 'N/A')}")
         st.write(f"**Market Cap:** {fundamentals.get('MarketCapitalization', 'N/A')}")
         st.write(f"**Revenue:** {fundamentals.get('RevenueTTM', 'N/A')}")
         st.write(f"**Profit Margin:** {fundamentals.get('ProfitMargin', 'N/A')}")
 
-    st.subheader("📉 Economic Indicators")
-    indicators = ["GDP", "UNRATE", "CPIAUCSL"]
-    for indicator in indicators:
-        economic_data = get_economic_data(indicator)
-        if economic_data:
-            latest_data = economic_data[-1]
-            st.write(f"**Latest {indicator}:** {latest_data['value']} (Date: {latest_data['date']})")
+def render_indicator(indicator, economic_data):
+    if economic_data:
+        latest_data = economic_data[-1]
+        st.write(f"**Latest {indicator}:** {latest_data['value']} (Date: {latest_data['date']})")
 
-    st.subheader("💰 Funding & Investment Opportunities")
-    company_data = get_fmp_data(symbol.lower())
+def render_company(company_data):
     if company_data:
         st.write(f"**Company Name:** {company_data.get('companyName', 'N/A')}")
         st.write(f"**CEO:** {company_data.get('ceo', 'N/A')}")
@@ -73,4 +67,43 @@ if symbol:
     else:
         st.write("No recent funding data found.")
 
-st.success("✅ Investment & M&A Report Generated!")
\ No newline at end of file
+# Streamlit UI
+st.title("💼 Investment & M&A Agent")
+st.markdown("AI-driven insights for strategic growth, M&A, and investments.")
+
+symbol = st.text_input("🔍 Enter Stock Symbol", value="AAPL")
+
+if symbol:
+    # Lay out every section first, then fill each one as its fetch completes
+    st.subheader("📊 Company Financial Overview")
+    fundamentals_slot = st.empty()
+    st.subheader("📉 Economic Indicators")
+    indicator_slots = {indicator: st.empty() for indicator in INDICATORS}
+    st.subheader("💰 Funding & Investment Opportunities")
+    company_slot = st.empty()
+
+    # All five calls are independent: latency is the slowest one, not the sum
+    futures = {fetch_pool.submit(get_fundamental_data, symbol): (fundamentals_slot, render_fundamentals)}
+    for indicator in INDICATORS:
+        render = lambda data, indicator=indicator: render_indicator(indicator, data)
+        futures[fetch_pool.submit(get_economic_data, indicator)] = (indicator_slots[indicator], render)
+    futures[fetch_pool.submit(get_fmp_data, symbol.lower())] = (company_slot, render_company)
+
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=PAGE_TIMEOUT):
+            pending.discard(future)
+            slot, render = futures[future]
+            with slot.container():
+                try:
+                    render(future.result())
+                except requests.exceptions.RequestException as e:
+                    st.error(f"Error fetching data: {e}")
+                    render(None)
+    except FuturesTimeoutError:
+        for future in pending:
+            future.cancel()
+            slot, _ = futures[future]
+            slot.warning(f"Timed out after {PAGE_TIMEOUT}s waiting for this data.")
+
+st.success("✅ Investment & M&A Report Generated!")
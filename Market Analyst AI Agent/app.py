@@ -1,8 +1,10 @@
 import requests
-import json
 import os
 import gradio as gr
-from transformers import pipeline
+from market_data import MarketDataClient
+from model_runtime import CPUProfile, LazyPipeline
+import time
+from summarizer import CHUNK_TOKENS, MapReduceSummarizer, economic_stats, format_timings, stock_stats
 
 # Load API keys from environment variables
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
@@ -13,16 +15,26 @@ print("Alpha Vantage API Key:", ALPHA_VANTAGE_API_KEY)
 print("FRED API Key:", FRED_API_KEY)
 print("News API Key:", NEWS_API_KEY)
 
-# Hugging Face summary model with facebook/bart-large-cnn
-summary_pipeline = pipeline("summarization", model="facebook/bart-large-cnn")
+# Pooled, cached client for Alpha Vantage / FRED (and the News API)
+market_data = MarketDataClient(alpha_vantage_key=ALPHA_VANTAGE_API_KEY, fred_key=FRED_API_KEY)
+NEWS_TTL = 10 * 60  # seconds
+
+# Seconds a request waits for the model to finish loading before reporting its status
+MODEL_WAIT = float(os.getenv("MODEL_WAIT_SECONDS", "60"))
+
+# Hugging Face summary model with facebook/bart-large-cnn, loaded in the background so the UI binds at once
+cpu_profile = CPUProfile.from_env()
+summary_pipeline = LazyPipeline("summarization", "facebook/bart-large-cnn", profile=cpu_profile).start()
+# Chunks must fit the profile's fixed max input length
+chunk_tokens = min(CHUNK_TOKENS, cpu_profile.max_input_tokens - 24) if cpu_profile and cpu_profile.max_input_tokens else CHUNK_TOKENS
+summarizer = MapReduceSummarizer(summary_pipeline, chunk_tokens=chunk_tokens)
 
 # Function to get market news
 def get_market_news():
-    url = f"https://newsapi.org/v2/top-headlines?category=business&language=en&apiKey={NEWS_API_KEY}"
+    url = "https://newsapi.org/v2/top-headlines"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        articles = response.json().get("articles", [])
+        params = {"category": "business", "language": "en", "apiKey": NEWS_API_KEY}
+        articles = market_data.get_json(url, params, ttl=NEWS_TTL).get("articles", [])
         return articles
     except requests.exceptions.RequestException as e:
         print(f"Error fetching market news: {e}")
@@ -30,11 +42,8 @@ def get_market_news():
 
 # Function to get stock data from Alpha Vantage
 def get_stock_data(symbol):
-    url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&apikey={ALPHA_VANTAGE_API_KEY}"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json().get("Time Series (Daily)", {})
+        data = market_data.daily_series(symbol).get("Time Series (Daily)", {})
         return data
     except requests.exceptions.RequestException as e:
         print(f"Error fetching stock data: {e}")
@@ -42,49 +51,49 @@ def get_stock_data(symbol):
 
 # Function to get economic data from FRED
 def get_economic_data(series_id):
-    url = f"https://api.stlouisfed.org/fred/series/observations?series_id={series_id}&api_key={FRED_API_KEY}&file_type=json"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json().get("observations", [])
+        data = market_data.fred_observations(series_id)
         return data
     except requests.exceptions.RequestException as e:
         print(f"Error fetching economic data: {e}")
         return []
 
-# Function to generate executive summary
-def generate_executive_summary(data):
-    prompt = f"Summarize this market analysis:\n{data}"
-    # Truncate the input to a maximum length of 1024 tokens
-    truncated_prompt = prompt[:1024]
-    summary = summary_pipeline(truncated_prompt, max_length=300, min_length=50, do_sample=False)[0]["summary_text"]
-    return summary
+# Function to generate executive summary (map-reduce over token-budgeted chunks)
+def generate_executive_summary(headlines, facts):
+    return summarizer.summarize(headlines, facts)
 
 # Gradio interface function
 def market_analysis():
     print("Fetching Market News & Analyzing Sentiment...")
+    start = time.perf_counter()
     market_news = get_market_news()
     stock_data = get_stock_data("AAPL")  # Example stock symbol
     economic_data = get_economic_data("GDP")  # Example economic series ID
+    fetch_time = time.perf_counter() - start
+
+    # Reduce the numeric series to compact statistics instead of dumping them into the prompt
+    start = time.perf_counter()
+    headlines = [article["title"] for article in market_news if article.get("title")]
+    facts = stock_stats("AAPL", stock_data) + economic_stats("GDP", economic_data)
+    stats_time = time.perf_counter() - start
+
+    # Readiness check: the data fetch above overlaps with the model load
+    if not summary_pipeline.wait(timeout=MODEL_WAIT):
+        return summary_pipeline.status(), format_timings({"fetch": fetch_time, "statistics": stats_time})
 
-    # Prepare data for summary
-    summary_data = {
-        "Market News": [article["title"] for article in market_news],
-        "Stock Data": stock_data,
-        "Economic Data": economic_data
-    }
-    
     print("Generating Executive Summary...")
-    executive_summary = generate_executive_summary(json.dumps(summary_data, indent=2))
+    executive_summary, timings = generate_executive_summary(headlines, facts)
+    timings = {"fetch": fetch_time, "statistics": stats_time, **timings}
+    print(format_timings(timings))
 
     print("Executive Summary generated successfully.")
-    return executive_summary
+    return executive_summary, format_timings(timings)
 
 # Create Gradio interface
 iface = gr.Interface(
     fn=market_analysis,
     inputs=[],
-    outputs="text",
+    outputs=[gr.Textbox(label="Executive Summary"), gr.Textbox(label="Latency per Stage")],
     title="Market News Analysis",
     description="Fetches market news and generates an executive summary."
 )
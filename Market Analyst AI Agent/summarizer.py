@@ -0,0 +1,154 @@
+"""Map-reduce summarization for the market analysis.
+
+Instead of dumping everything into one prompt and cutting it at 1024
+characters:
+
+1. numeric series (daily bars, FRED observations) are reduced to a few lines
+   of statistics, which go straight into the final prompt
+2. headlines are packed into chunks that fit the model's token budget
+3. the chunks are summarized in batched pipeline calls (map)
+4. the partial summaries are combined, re-chunking until they fit one
+   window, and summarized together with the statistics (reduce)
+
+Every stage is timed; ``summarize`` returns the summary and the timings.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+# BART's window is 1024 tokens; leave room for the instruction and special tokens
+CHUNK_TOKENS = 900
+BATCH_SIZE = 4
+MAX_REDUCE_ROUNDS = 3
+
+
+# Function to reduce an Alpha Vantage "Time Series (Daily)" dict to summary lines
+def stock_stats(symbol, series):
+    if not series:
+        return [f"{symbol}: no price data available."]
+    df = pd.DataFrame.from_dict(series, orient="index", dtype=float).sort_index()
+    close = df["4. close"].to_numpy()
+    returns = np.diff(close) / close[:-1]
+    lines = [
+        f"{symbol} closed at {close[-1]:.2f} on {df.index[-1]}, "
+        f"{(close[-1] / close[0] - 1) * 100:+.1f}% over {len(close)} trading days since {df.index[0]}.",
+        f"{symbol} traded between {df['3. low'].min():.2f} and {df['2. high'].max():.2f}.",
+    ]
+    if len(returns):
+        lines.append(f"{symbol} daily volatility was {returns.std() * 100:.2f}%, "
+                     f"last day {returns[-1] * 100:+.2f}%.")
+    if "5. volume" in df:
+        lines.append(f"{symbol} average daily volume was {df['5. volume'].mean():,.0f} shares.")
+    return lines
+
+
+# Function to reduce FRED observations to summary lines
+def economic_stats(series_id, observations):
+    values = pd.to_numeric(pd.Series([o.get("value") for o in observations]), errors="coerce")
+    dates = [o.get("date") for o in observations]
+    valid = values.notna().to_numpy()
+    if not valid.any():
+        return [f"{series_id}: no economic data available."]
+    values = values[valid].to_numpy()
+    dates = [d for d, ok in zip(dates, valid) if ok]
+    lines = [f"{series_id} latest value is {values[-1]:,.2f} ({dates[-1]})."]
+    if len(values) > 1:
+        lines.append(f"{series_id} changed {(values[-1] / values[-2] - 1) * 100:+.2f}% from the previous reading ({dates[-2]}).")
+    if len(values) > 4:
+        lines.append(f"{series_id} changed {(values[-1] / values[-5] - 1) * 100:+.2f}% over the last four readings.")
+    return lines
+
+
+class MapReduceSummarizer:
+    """Token-budgeted, batched map-reduce over a Hugging Face summarization pipeline."""
+
+    def __init__(self, pipeline, chunk_tokens=CHUNK_TOKENS, batch_size=BATCH_SIZE, max_rounds=MAX_REDUCE_ROUNDS):
+        self.pipeline = pipeline
+        self.chunk_tokens = chunk_tokens
+        self.batch_size = batch_size
+        self.max_rounds = max_rounds
+
+    @property
+    def tokenizer(self):
+        # Looked up on use, so a lazily loaded pipeline is not forced to load here
+        return getattr(self.pipeline, "tokenizer", None)
+
+    def count_tokens(self, texts):
+        texts = list(texts)
+        # Fast tokenizers raise IndexError on an empty batch
+        if not texts:
+            return []
+        if self.tokenizer is None:
+            return [len(text.split()) for text in texts]
+        return [len(ids) for ids in self.tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+    def chunk(self, lines):
+        """Greedily pack lines into chunks of at most ``chunk_tokens`` tokens (an over-long line is its own chunk)."""
+        if not lines:
+            return []
+        chunks, current, used = [], [], 0
+        for line, n in zip(lines, self.count_tokens(lines)):
+            if current and used + n > self.chunk_tokens:
+                chunks.append("\n".join(current))
+                current, used = [], 0
+            current.append(line)
+            used += n
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+
+    def _summarize_batch(self, chunks, max_length, min_length):
+        outputs = self.pipeline(chunks, batch_size=self.batch_size, max_length=max_length,
+                                min_length=min_length, do_sample=False, truncation=True)
+        return [output["summary_text"] for output in outputs]
+
+    def summarize(self, text_lines, fact_lines=(), max_length=300, min_length=50, partial_length=120):
+        """Summarize ``text_lines`` (e.g. headlines) together with precomputed ``fact_lines``.
+
+        Returns ``(summary, timings)``, with timings in seconds per stage.
+        """
+        timings = {}
+        fact_lines = list(fact_lines)
+        start = time.perf_counter()
+        chunks = self.chunk([line for line in text_lines if line])
+        timings["chunk"] = time.perf_counter() - start
+
+        # Map: one batched call over all chunks
+        start = time.perf_counter()
+        partials = self._summarize_batch(chunks, partial_length, min(30, partial_length // 2)) if chunks else []
+        timings["map"] = time.perf_counter() - start
+
+        # Reduce the partial summaries until they fit in one window next to the facts
+        start = time.perf_counter()
+        fact_tokens = sum(self.count_tokens(fact_lines))
+        rounds = 0
+        while len(partials) > 1 and sum(self.count_tokens(partials)) + fact_tokens > self.chunk_tokens \
+                and rounds < self.max_rounds:
+            grouped = self.chunk(partials)
+            if len(grouped) == len(partials):
+                break
+            partials = self._summarize_batch(grouped, partial_length, min(30, partial_length // 2))
+            rounds += 1
+        timings["reduce"] = time.perf_counter() - start
+
+        # Final pass over the statistics plus the combined partial summaries
+        start = time.perf_counter()
+        if not fact_lines and not partials:
+            # No headlines and no statistics: nothing for the model to summarize
+            timings.update({"final": 0.0, "chunks": 0, "reduce_rounds": 0})
+            return "No market news or statistics were available to summarize.", timings
+        final_input = "Summarize this market analysis:\n" + "\n".join(fact_lines + partials)
+        summary = self._summarize_batch([final_input], max_length, min_length)[0]
+        timings["final"] = time.perf_counter() - start
+
+        timings.update({"chunks": len(chunks), "reduce_rounds": rounds})
+        return summary, timings
+
+
+# Function to format stage timings for display
+def format_timings(timings):
+    return "\n".join(
+        f"{stage}: {value * 1000:.0f} ms" if isinstance(value, float) else f"{stage}: {value}"
+        for stage, value in timings.items()
+    )
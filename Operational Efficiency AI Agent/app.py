@@ -1,12 +1,20 @@
 import os
 import requests
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
+from market_data import MarketDataClient
+from charts import line_chart
 
 # Load API Key from Hugging Face Secrets
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
 
+# Pooled, cached client shared by all sessions
+@st.cache_resource
+def load_market_data():
+    return MarketDataClient(alpha_vantage_key=ALPHA_VANTAGE_API_KEY)
+
+market_data = load_market_data()
+
 # Function to simulate operational efficiency scoring
 def get_efficiency_score():
     """Simulated AI-driven efficiency score (0 to 100)"""
@@ -25,33 +33,29 @@ def suggest_optimizations():
 
 # Function to fetch industry efficiency benchmarks (Example API call)
 def get_industry_benchmark():
-    url = f"https://www.alphavantage.co/query?function=SECTOR&apikey={ALPHA_VANTAGE_API_KEY}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json().get("Rank B: Operating Margin %", {})
-    return {}
+    try:
+        return market_data.sector_performance().get("Rank B: Operating Margin %", {})
+    except requests.exceptions.RequestException:
+        return {}
 
 # Function to get operational data for a specific company
 def get_company_efficiency(symbol):
-    url = f"https://www.alphavantage.co/query?function=OVERVIEW&symbol={symbol}&apikey={ALPHA_VANTAGE_API_KEY}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    return {}
+    try:
+        return market_data.overview(symbol)
+    except requests.exceptions.RequestException:
+        return {}
 
 # Function to visualize efficiency trend
 def plot_efficiency_trend():
     months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
     efficiency_scores = np.random.randint(50, 95, len(months))  # Simulated data
     
-    plt.figure(figsize=(8, 4))
-    plt.plot(months, efficiency_scores, marker="o", linestyle="--", color="blue")
-    plt.xlabel("Month")
-    plt.ylabel("Efficiency Score")
-    plt.title("📈 Operational Efficiency Over Time")
-    plt.grid(True)
-
-    st.pyplot(plt)
+    # Per-call figure (no shared pyplot state), cached by data + parameters
+    png = line_chart(np.array(months, dtype=object), {"Efficiency Score": efficiency_scores},
+                     title="📈 Operational Efficiency Over Time", xlabel="Month", ylabel="Efficiency Score",
+                     width=8, height=4, grid=True, legend=False,
+                     styles={"Efficiency Score": {"marker": "o", "linestyle": "--", "color": "blue"}})
+    st.image(png, use_container_width=True)
 
 # Streamlit UI
 st.title("⚙️ Operational Efficiency Agent")
@@ -1,47 +1,68 @@
 import streamlit as st
 import requests
-import pandas as pd
-import matplotlib.pyplot as plt
 import os
+import threading
+from market_data import MarketDataClient
+from charts import line_chart
+from risk_engine import BarStore, RiskEngine
+from edgar_mirror import EdgarMirror
+from datetime import date, timedelta
 
 # Load API keys from environment variables
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY", "your-alpha-vantage-api-key-here")
 FRED_API_KEY = os.getenv("FRED_API_KEY", "your-fred-api-key-here")
 SEC_API_KEY = os.getenv("SEC_API_KEY", "your-sec-api-key-here")
+EDGAR_MIRROR_PATH = os.getenv("EDGAR_MIRROR_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "edgar_mirror.sqlite"))
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bar_store"))
 
-# Function to fetch stock market risk (Alpha Vantage)
-def get_stock_risk(symbol):
-    url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&apikey={ALPHA_VANTAGE_API_KEY}"
-    
-    try:
-        response = requests.get(url)
-        data = response.json()
-        
-        if "Time Series (Daily)" in data:
-            df = pd.DataFrame.from_dict(data["Time Series (Daily)"], orient="index", dtype=float)
-            df.index = pd.to_datetime(df.index)
-            df.sort_index(inplace=True)
-            
-            df["daily_return"] = df["4. close"].pct_change()
-            volatility = df["daily_return"].std()
-            
-            risk_score = "High" if volatility > 0.03 else "Medium" if volatility > 0.015 else "Low"
-            
-            return df, risk_score
-        else:
-            return None, "Unknown"
-    
-    except requests.exceptions.RequestException as e:
-        return None, "Unknown"
+# Pooled, cached client shared by all sessions
+@st.cache_resource
+def load_market_data():
+    return MarketDataClient(alpha_vantage_key=ALPHA_VANTAGE_API_KEY, fred_key=FRED_API_KEY)
+
+market_data = load_market_data()
+
+# Columnar store of daily bars for the whole watchlist
+@st.cache_resource
+def load_bar_store():
+    return BarStore(BAR_STORE_DIR)
+
+# One risk engine per watchlist, built once from the store and then updated bar by bar
+@st.cache_resource
+def load_risk_engine(symbols):
+    closes = load_bar_store().closes(list(symbols))
+    return RiskEngine.from_closes(closes), threading.Lock()
+
+bar_store = load_bar_store()
+
+# Function to sync the watchlist's bars into the store and feed new bars to the risk engine
+def get_watchlist_risk(symbols):
+    available = []
+    for symbol in symbols:
+        try:
+            # Parsed, date-sorted daily bars (cached)
+            bars = market_data.daily_bars(symbol)
+        except requests.exceptions.RequestException:
+            bars = None
+        if bars is not None:
+            bar_store.upsert(symbol, bars)
+        if len(bar_store.load(symbol, columns=["close"])):
+            available.append(symbol)
+    if not available:
+        return None, None
+
+    engine, lock = load_risk_engine(tuple(available))
+    with lock:
+        closes = bar_store.closes(available).ffill()
+        new_bars = closes[closes.index > engine.last_date] if engine.last_date is not None else closes
+        for date, row in new_bars.iterrows():
+            engine.update(date, row.to_numpy())
+        return engine.metrics(), engine
 
 # Function to fetch economic risk indicators from FRED
 def get_fred_data(series_id):
-    url = f"https://api.stlouisfed.org/fred/series/observations?series_id={series_id}&api_key={FRED_API_KEY}&file_type=json"
-
     try:
-        response = requests.get(url)
-        data = response.json()
-        observations = data.get("observations", [])
+        observations = market_data.fred_observations(series_id)
         
         if not observations:
             return "No economic data available."
@@ -52,42 +73,34 @@ def get_fred_data(series_id):
     except requests.exceptions.RequestException as e:
         return "Error fetching economic data."
 
+# Local EDGAR mirror: ticker -> CIK index plus filings synced with conditional requests
+@st.cache_resource
+def load_edgar_mirror():
+    return EdgarMirror(EDGAR_MIRROR_PATH)
+
 # Function to fetch SEC filings (Regulatory Risk)
-def get_sec_filings(cik):
-    url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-    headers = {"User-Agent": "YourAppName/1.0 (yourname@example.com)"}
-    
+def get_sec_filings(symbols, forms=None, since=None, limit=5):
+    mirror = load_edgar_mirror()
     try:
-        response = requests.get(url, headers=headers)
-        data = response.json()
-        
-        filings = data.get("filings", {}).get("recent", {})
-        if not filings:
-            return ["No recent filings found."]
-        
-        filing_list = []
-        for accession_number in filings["accessionNumber"][:5]:
-            filing_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession_number.replace('-', '')}/{accession_number}-index.htm"
-            filing_list.append({"accession_number": accession_number, "url": filing_url})
-        
-        return filing_list
-    
+        mirror.sync_tickers()
+        # Unchanged submissions answer 304 and add nothing; only new filings are stored
+        failed = [ticker for ticker, added in mirror.sync(symbols).items() if added is None]
+        if failed:
+            st.warning(f"Could not refresh SEC filings for {', '.join(failed)}; showing the local mirror for them.")
     except requests.exceptions.RequestException:
-        return ["Error fetching SEC filings."]
-    except requests.exceptions.JSONDecodeError:
-        return ["Error decoding SEC filings."]
+        st.warning("Could not refresh SEC filings; showing the local mirror.")
+    except ValueError:
+        st.warning("Could not decode SEC filings; showing the local mirror.")
+    return mirror.filings(tickers=symbols, forms=forms, since=since, limit=limit)
 
 # Function to plot historical risk trend
 def plot_risk_trend(df, symbol):
     if df is not None and "daily_return" in df.columns:
-        plt.figure(figsize=(10, 5))
-        plt.plot(df.index, df["daily_return"], label="Daily Return Volatility", color="blue")
-        plt.axhline(y=0, color='black', linestyle='--', linewidth=0.5)
-        plt.legend()
-        plt.title(f"Historical Risk Trend for {symbol}")
-        plt.xlabel("Date")
-        plt.ylabel("Daily Return Volatility")
-        st.pyplot(plt)
+        # Per-call figure, downsampled to the pixel width and cached by data + parameters
+        png = line_chart(df.index.to_numpy(), {"Daily Return Volatility": df["daily_return"].to_numpy()},
+                         title=f"Historical Risk Trend for {symbol}", xlabel="Date", ylabel="Daily Return Volatility",
+                         width=10, height=5, hline=0, styles={"Daily Return Volatility": {"color": "blue"}})
+        st.image(png, use_container_width=True)
     else:
         st.write("⚠️ Not enough data to display risk trends.")
 
@@ -96,14 +109,27 @@ st.title("🛡️ Risk & Compliance Agent")
 st.write("Monitor financial, regulatory, and cybersecurity risks.")
 
 # Stock Market Risk
-symbol = st.text_input("🔍 Enter Stock Symbol", value="AAPL")
+symbol = st.text_input("🔍 Enter Stock Symbols (comma-separated watchlist)", value="AAPL")
 
 if symbol:
-    # Fetch and display stock risk
-    df, risk_score = get_stock_risk(symbol)
+    symbols = [s.strip().upper() for s in symbol.split(",") if s.strip()]
+    # Fetch and display stock risk for the whole watchlist
+    metrics, engine = get_watchlist_risk(symbols)
     
     st.subheader("📉 Market & Economic Risk")
-    st.write(f"**Risk Score:** {risk_score}")
+    if metrics is None:
+        st.write("**Risk Score:** Unknown")
+        df = None
+    else:
+        st.dataframe(metrics.style.format(precision=4))
+        portfolio = engine.portfolio_risk()
+        st.write(f"**Equal-weight portfolio:** daily volatility {portfolio['volatility']:.2%}, "
+                 f"VaR {engine.level:.0%} {portfolio['var']:.2%}, CVaR {portfolio['cvar']:.2%}")
+        if len(engine.symbols) > 1:
+            st.write("**Return correlation**")
+            st.dataframe(engine.correlation().round(2))
+        # Daily returns of the first symbol for the trend chart
+        df = bar_store.closes(engine.symbols[:1]).pct_change().rename(columns={engine.symbols[0]: "daily_return"})
     
     # Fetch and display economic data
     st.subheader("📊 Economic Indicators")
@@ -111,13 +137,23 @@ if symbol:
     
     # Fetch and display SEC filings
     st.subheader("📜 SEC Filings (Regulatory Risk)")
-    cik = "0000320193"  # CIK for Apple Inc.
-    filings = get_sec_filings(cik)
-    for filing in filings:
-        st.write(f"📄 [Filing: {filing['accession_number']}]({filing['url']})")
+    filings = get_sec_filings(symbols[:1])
+    if filings.empty:
+        st.write("No recent filings found.")
+    for filing in filings.itertuples():
+        st.write(f"📄 [Filing: {filing.accession}]({filing.url}) {filing.form} ({filing.filing_date})")
+
+    if len(symbols) > 1:
+        # Answered from the local index once the watchlist is synced
+        st.subheader("📰 8-K Filings Across the Watchlist (Last 30 Days)")
+        recent_8k = get_sec_filings(symbols, forms=["8-K"], since=date.today() - timedelta(days=30), limit=None)
+        if recent_8k.empty:
+            st.write("No 8-K filings in the last 30 days.")
+        else:
+            st.dataframe(recent_8k[["ticker", "form", "filing_date", "description", "url"]])
 
     # Plot Historical Risk Trend
     st.subheader("📊 Historical Risk Trends")
-    plot_risk_trend(df, symbol)
+    plot_risk_trend(df, symbols[0] if metrics is None else engine.symbols[0])
 
 st.success("✅ Risk & Compliance Report Updated!")
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""Local, incrementally synced mirror of SEC EDGAR filing metadata.
+
+- ``company_tickers.json`` is loaded into a ticker -> CIK index
+- ``submissions/CIK##########.json`` is fetched with conditional requests
+  (``If-None-Match`` / ``If-Modified-Since``); a 304 costs no parsing, and a
+  200 only inserts filings whose accession number is new
+- filings are indexed by CIK, form type and filing date in SQLite, so
+  watchlist-wide queries never touch the network:
+
+    mirror = EdgarMirror("edgar_mirror.sqlite")
+    mirror.sync_tickers()
+    mirror.sync(["AAPL", "MSFT", ...])
+    mirror.filings(tickers=watchlist, forms=["8-K"], since=date.today() - timedelta(days=30))
+
+SEC asks for a descriptive User-Agent with a contact address (``SEC_USER_AGENT``)
+and at most 10 requests per second, which ``sync`` respects.
+
+For offline runs, ``RecordingSession`` saves every response under a directory
+and ``ReplaySession`` serves them back, so the mirror can be exercised against
+recorded fixtures:
+
+    mirror = EdgarMirror(":memory:", session=ReplaySession("fixtures/edgar"))
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import requests
+
+SEC_USER_AGENT = os.getenv("SEC_USER_AGENT", "RiskComplianceAgent/1.0 (contact@example.com)")
+SEC_DATA_URL = os.getenv("SEC_DATA_URL", "https://data.sec.gov")
+SEC_WWW_URL = os.getenv("SEC_WWW_URL", "https://www.sec.gov")
+MIN_REQUEST_INTERVAL = 0.1  # SEC fair-access limit: 10 requests per second
+
+FILING_FIELDS = {
+    "accessionNumber": "accession",
+    "form": "form",
+    "filingDate": "filing_date",
+    "reportDate": "report_date",
+    "primaryDocument": "primary_document",
+    "primaryDocDescription": "description",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickers (ticker TEXT PRIMARY KEY, cik INTEGER NOT NULL, title TEXT);
+CREATE INDEX IF NOT EXISTS tickers_cik ON tickers (cik);
+CREATE TABLE IF NOT EXISTS sources (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, checked_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS filings (
+    accession TEXT PRIMARY KEY,
+    cik INTEGER NOT NULL,
+    form TEXT NOT NULL,
+    filing_date TEXT NOT NULL,
+    report_date TEXT,
+    primary_document TEXT,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS filings_cik_date ON filings (cik, filing_date);
+CREATE INDEX IF NOT EXISTS filings_form_date ON filings (form, filing_date);
+"""
+
+
+# Function to build the EDGAR index page URL for a filing
+def filing_url(cik, accession, www_url=SEC_WWW_URL):
+    return f"{www_url.rstrip('/')}/Archives/edgar/data/{int(cik)}/{accession.replace('-', '')}/{accession}-index.htm"
+
+
+class EdgarMirror:
+    """SQLite-backed mirror of EDGAR submissions, synced with conditional GETs."""
+
+    def __init__(self, path, session=None, user_agent=SEC_USER_AGENT, data_url=SEC_DATA_URL, www_url=SEC_WWW_URL,
+                 timeout=15):
+        self.path = path
+        self.session = session or requests.Session()
+        self.headers = {"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate"}
+        self.data_url = data_url.rstrip("/")
+        self.www_url = www_url.rstrip("/")
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._throttle_lock = threading.Lock()
+        self._last_request = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection, shared across Streamlit sessions behind the lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+        self.stats = {"requests": 0, "not_modified": 0, "new_filings": 0, "errors": 0}
+        self.errors = {}  # ticker -> error message from the latest sync
+
+    # Function to GET with the stored validators; returns parsed JSON, or None on 304 / when still fresh
+    def _conditional_get(self, url, max_age=0):
+        with self._lock:
+            row = self._conn.execute("SELECT etag, last_modified, checked_at FROM sources WHERE url = ?", (url,)).fetchone()
+        if row is not None and time.time() - row[2] < max_age:
+            return None
+
+        headers = dict(self.headers)
+        if row is not None:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+        # Reserve the next request slot under the lock, then sleep outside it, so concurrent sessions share the limit
+        with self._throttle_lock:
+            now = time.monotonic()
+            slot = max(now, self._last_request + MIN_REQUEST_INTERVAL)
+            self._last_request = slot
+        if slot > now:
+            time.sleep(slot - now)
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        self.stats["requests"] += 1
+
+        payload = None
+        if response.status_code == 304:
+            self.stats["not_modified"] += 1
+        else:
+            response.raise_for_status()
+            payload = response.json()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources (url, etag, last_modified, checked_at) VALUES (?, ?, ?, ?)",
+                (url,
+                 response.headers.get("ETag") or (row[0] if row else None),
+                 response.headers.get("Last-Modified") or (row[1] if row else None),
+                 time.time()))
+        return payload
+
+    def sync_tickers(self, max_age=24 * 3600):
+        """Refresh the ticker -> CIK index from company_tickers.json."""
+        payload = self._conditional_get(f"{self.www_url}/files/company_tickers.json", max_age)
+        if payload is None:
+            return 0
+        rows = [(entry["ticker"].upper(), int(entry["cik_str"]), entry.get("title")) for entry in payload.values()]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO tickers (ticker, cik, title) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def cik(self, ticker):
+        """CIK for a ticker from the local index, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT cik FROM tickers WHERE ticker = ?", (ticker.upper(),)).fetchone()
+        return row[0] if row else None
+
+    def ciks(self, tickers):
+        """{ticker: cik} for the tickers present in the index."""
+        tickers = [t.upper() for t in tickers]
+        if not tickers:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT ticker, cik FROM tickers WHERE ticker IN ({','.join('?' * len(tickers))})", tickers).fetchall()
+        return dict(rows)
+
+    def _insert_filings(self, cik, recent):
+        columns = [recent.get(field, []) for field in FILING_FIELDS]
+        rows = [(accession, cik, form, filing_date, report_date or None, document or None, description or None)
+                for accession, form, filing_date, report_date, document, description in zip(*columns)]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            # Accession numbers never change, so only unseen filings are added
+            self._conn.executemany("INSERT OR IGNORE INTO filings "
+                                   "(accession, cik, form, filing_date, report_date, primary_document, description) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            added = self._conn.total_changes - before
+        self.stats["new_filings"] += added
+        return added
+
+    def sync_cik(self, cik, max_age=15 * 60, include_history=False):
+        """Fetch one company's submissions if changed; returns the number of new filings."""
+        cik = int(cik)
+        payload = self._conditional_get(f"{self.data_url}/submissions/CIK{cik:010d}.json", max_age)
+        if payload is None:
+            return 0
+        added = self._insert_filings(cik, payload.get("filings", {}).get("recent", {}))
+        if include_history:
+            # Older filings live in immutable paged files; each is fetched once
+            for page in payload.get("filings", {}).get("files", []):
+                older = self._conditional_get(f"{self.data_url}/submissions/{page['name']}", max_age=float("inf"))
+                if older is not None:
+                    added += self._insert_filings(cik, older)
+        return added
+
+    def sync(self, tickers, max_age=15 * 60, include_history=False):
+        """Sync every ticker in the watchlist; returns {ticker: new filings}, None where the sync failed.
+
+        Unknown tickers are skipped; failures are kept in ``errors`` and do not stop the other tickers.
+        """
+        results = {}
+        self.errors = {}
+        for ticker, cik in self.ciks(tickers).items():
+            try:
+                results[ticker] = self.sync_cik(cik, max_age, include_history)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                results[ticker] = None
+                self.errors[ticker] = str(e)
+                self.stats["errors"] += 1
+        return results
+
+    def filings(self, tickers=None, ciks=None, forms=None, since=None, until=None, limit=None):
+        """Filings from the local index, newest first, as a DataFrame (with ticker and index-page URL)."""
+        ciks = list(ciks or [])
+        if tickers:
+            ciks += list(self.ciks(tickers).values())
+            if not ciks:
+                return pd.DataFrame(columns=["ticker", "cik", *FILING_FIELDS.values(), "url"])
+        clauses, params = [], []
+        if ciks:
+            clauses.append(f"f.cik IN ({','.join('?' * len(ciks))})")
+            params += [int(c) for c in ciks]
+        if forms:
+            clauses.append(f"f.form IN ({','.join('?' * len(forms))})")
+            params += list(forms)
+        if since is not None:
+            clauses.append("f.filing_date >= ?")
+            params.append(str(since))
+        if until is not None:
+            clauses.append("f.filing_date <= ?")
+            params.append(str(until))
+        query = ("SELECT (SELECT MIN(t.ticker) FROM tickers t WHERE t.cik = f.cik) AS ticker, f.cik, f.accession, "
+                 "f.form, f.filing_date, f.report_date, f.primary_document, f.description FROM filings f")
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY f.filing_date DESC, f.accession DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            df = pd.read_sql_query(query, self._conn, params=params)
+        df["url"] = [filing_url(cik, accession, self.www_url) for cik, accession in zip(df["cik"], df["accession"])]
+        return df
+
+
+class _RecordedResponse:
+    def __init__(self, status_code, headers, payload):
+        self.status_code = status_code
+        self.headers = headers
+        self._payload = payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} (recorded)", response=self)
+
+    def json(self):
+        return self._payload
+
+
+def _fixture_path(directory, url):
+    return os.path.join(directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+
+class RecordingSession:
+    """Wraps a ``requests.Session`` and saves each 200 response as a fixture file."""
+
+    def __init__(self, directory, session=None):
+        self.directory = directory
+        self.session = session or requests.Session()
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, url, headers=None, timeout=None):
+        response = self.session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 200:
+            fixture = {"url": url, "headers": {k: v for k, v in response.headers.items() if k in ("ETag", "Last-Modified")},
+                       "payload": response.json()}
+            with open(_fixture_path(self.directory, url), "w", encoding="utf-8") as f:
+                json.dump(fixture, f)
+        return response
+
+
+class ReplaySession:
+    """Serves recorded fixtures, honouring If-None-Match with a 304 (missing fixtures are 404s)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        try:
+            with open(_fixture_path(self.directory, url), "r", encoding="utf-8") as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            return _RecordedResponse(404, {}, None)
+        etag = fixture["headers"].get("ETag")
+        if etag and (headers or {}).get("If-None-Match") == etag:
+            return _RecordedResponse(304, fixture["headers"], None)
+        return _RecordedResponse(200, fixture["headers"], fixture["payload"])
@@ -0,0 +1,197 @@
+"""Watchlist risk: a columnar bar store plus an incrementally updated risk engine.
+
+``BarStore`` keeps one Parquet file of daily bars per symbol and only ever
+appends dates it has not seen. ``RiskEngine`` holds, for every symbol at
+once, the last ``lookback`` daily returns in a ring buffer, running sums for
+the correlation matrix, and running peaks for drawdown. A new bar costs
+O(n_symbols * lookback) for VaR/CVaR/volatility plus O(n_symbols ** 2) for the
+correlation update; history is never recomputed.
+
+    store = BarStore("bar_store")
+    store.upsert("AAPL", bars)                   # bars: DataFrame indexed by date
+    engine = RiskEngine.from_closes(store.closes(["AAPL", "MSFT"]))
+    engine.update(date, [190.1, 410.3])          # one new bar for every symbol
+    engine.metrics(), engine.correlation(), engine.portfolio_risk()
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = {"1. open": "open", "2. high": "high", "3. low": "low", "4. close": "close", "5. volume": "volume"}
+TRADING_DAYS = 252
+
+# Daily-volatility cut-offs for the High/Medium/Low score (same as the single-symbol version)
+HIGH_VOLATILITY = 0.03
+MEDIUM_VOLATILITY = 0.015
+
+
+class BarStore:
+    """Daily bars on disk, one Parquet file per symbol (date index; open/high/low/close/volume float64)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, symbol):
+        return os.path.join(self.directory, f"{symbol.upper()}.parquet")
+
+    def load(self, symbol, columns=None):
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=columns or list(BAR_COLUMNS.values()), dtype=float)
+        return pd.read_parquet(path, columns=columns)
+
+    def upsert(self, symbol, bars):
+        """Append the bars newer than what is stored; returns just those new rows."""
+        bars = bars.rename(columns=BAR_COLUMNS)[list(BAR_COLUMNS.values())].astype("float64").sort_index()
+        bars.index = pd.DatetimeIndex(bars.index, name="date")
+        stored = self.load(symbol)
+        new = bars[bars.index > stored.index.max()] if len(stored) else bars
+        if len(new):
+            combined = pd.concat([stored, new]) if len(stored) else new
+            combined.to_parquet(self._path(symbol))
+        return new
+
+    def closes(self, symbols):
+        """Wide frame of closes (rows = dates, columns = symbols), reading only the close column."""
+        return pd.DataFrame({symbol: self.load(symbol, columns=["close"])["close"] for symbol in symbols}).sort_index()
+
+
+# Function to map daily volatility to a risk score
+def risk_score(volatility):
+    return np.where(np.isnan(volatility), "Unknown",
+                    np.where(volatility > HIGH_VOLATILITY, "High",
+                             np.where(volatility > MEDIUM_VOLATILITY, "Medium", "Low")))
+
+
+class RiskEngine:
+    """Rolling volatility, historical VaR/CVaR, drawdown and correlation for a watchlist, updated per bar."""
+
+    def __init__(self, symbols, lookback=250, vol_window=21, level=0.95, weights=None):
+        self.symbols = list(symbols)
+        n = len(self.symbols)
+        self.lookback = lookback
+        self.vol_window = min(vol_window, lookback)
+        self.level = level
+        self.weights = np.full(n, 1.0 / n) if weights is None else np.asarray(weights, dtype=float)
+
+        self.returns = np.zeros((n, lookback))  # ring buffer of the last `lookback` returns
+        self.pos = 0                            # next slot to write
+        self.count = 0                          # filled slots
+        self.sum = np.zeros(n)                  # running sums over the ring, for the correlation matrix
+        self.cross = np.zeros((n, n))
+        self.last_close = np.full(n, np.nan)
+        self.peak = np.full(n, np.nan)
+        self.max_drawdown = np.zeros(n)
+        self.last_date = None
+        self._updates = 0
+
+    @classmethod
+    def from_closes(cls, closes, **kwargs):
+        """Initialise from a wide frame of closes in one vectorized pass."""
+        closes = closes.sort_index().ffill().dropna()
+        engine = cls(closes.columns, **kwargs)
+        if closes.empty:
+            return engine
+        values = closes.to_numpy(dtype=float)
+        returns = values[1:] / values[:-1] - 1
+        recent = returns[-engine.lookback:].T
+        engine.count = recent.shape[1]
+        engine.returns[:, :engine.count] = recent
+        engine.pos = engine.count % engine.lookback
+        engine._recompute_sums()
+
+        peaks = np.maximum.accumulate(values, axis=0)
+        engine.peak = peaks[-1]
+        engine.max_drawdown = (values / peaks - 1).min(axis=0)
+        engine.last_close = values[-1]
+        engine.last_date = closes.index[-1]
+        return engine
+
+    def _recompute_sums(self):
+        window = self._window()
+        self.sum = window.sum(axis=1)
+        self.cross = window @ window.T
+
+    # Function to view the filled part of the ring, oldest first
+    def _window(self, size=None):
+        size = self.count if size is None else min(size, self.count)
+        idx = (self.pos - size + np.arange(size)) % self.lookback
+        return self.returns[:, idx]
+
+    def update(self, date, closes):
+        """Add one bar (a close for every symbol, in ``symbols`` order)."""
+        closes = np.asarray(closes, dtype=float)
+        # A missing close carries the previous one forward (zero return)
+        closes = np.where(np.isnan(closes), self.last_close, closes)
+        if not np.isnan(self.last_close).any():
+            r = closes / self.last_close - 1
+            if self.count == self.lookback:
+                dropped = self.returns[:, self.pos]
+                self.sum -= dropped
+                self.cross -= np.outer(dropped, dropped)
+            else:
+                self.count += 1
+            self.returns[:, self.pos] = r
+            self.pos = (self.pos + 1) % self.lookback
+            self.sum += r
+            self.cross += np.outer(r, r)
+            self._updates += 1
+            # Re-derive the running sums now and then so subtraction error cannot build up
+            if self._updates % self.lookback == 0:
+                self._recompute_sums()
+
+        self.peak = np.fmax(self.peak, closes)
+        self.max_drawdown = np.fmin(self.max_drawdown, closes / self.peak - 1)
+        self.last_close = closes
+        self.last_date = date
+
+    def _var_cvar(self, returns):
+        """Historical VaR and CVaR (as positive losses) along the last axis."""
+        cutoff = np.quantile(returns, 1 - self.level, axis=-1, keepdims=True)
+        tail = np.where(returns <= cutoff, returns, np.nan)
+        return -cutoff[..., 0], -np.nanmean(tail, axis=-1)
+
+    def metrics(self):
+        """One row per symbol: rolling and annualized volatility, VaR, CVaR, drawdown and a risk score."""
+        n = len(self.symbols)
+        if self.count < 2:
+            nan = np.full(n, np.nan)
+            volatility, var, cvar = nan, nan, nan
+        else:
+            volatility = self._window(self.vol_window).std(axis=1, ddof=1)
+            var, cvar = self._var_cvar(self._window())
+        return pd.DataFrame({
+            "Last Close": self.last_close,
+            "Volatility (daily)": volatility,
+            "Volatility (annual)": volatility * np.sqrt(TRADING_DAYS),
+            f"VaR {self.level:.0%}": var,
+            f"CVaR {self.level:.0%}": cvar,
+            "Drawdown": self.last_close / self.peak - 1,
+            "Max Drawdown": self.max_drawdown,
+            "Risk Score": risk_score(volatility),
+        }, index=pd.Index(self.symbols, name="Symbol"))
+
+    def correlation(self):
+        """Correlation of daily returns over the lookback window, from the running sums."""
+        m = self.count
+        if m < 2:
+            return pd.DataFrame(np.nan, index=self.symbols, columns=self.symbols)
+        cov = (self.cross - np.outer(self.sum, self.sum) / m) / (m - 1)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.outer(std, std)
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.symbols, columns=self.symbols)
+
+    def portfolio_risk(self):
+        """VaR/CVaR and volatility of the weighted portfolio's daily return."""
+        if self.count < 2:
+            return {"volatility": np.nan, "var": np.nan, "cvar": np.nan}
+        portfolio = self.weights @ self._window()
+        var, cvar = self._var_cvar(portfolio)
+        return {"volatility": float(portfolio.std(ddof=1)), "var": float(var), "cvar": float(cvar)}
+
+    def returns_frame(self):
+        """The returns currently in the window, oldest first (rows = bars, columns = symbols)."""
+        return pd.DataFrame(self._window().T, columns=self.symbols)
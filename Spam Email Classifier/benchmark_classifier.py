@@ -0,0 +1,219 @@
+"""Latency / throughput / memory benchmark for the spam classifier pipeline.
+
+Times each stage at several corpus sizes and saves the results as JSON:
+
+  - clean_text                      per email
+  - TfidfVectorizer.fit_transform   whole training split
+  - MultinomialNB.fit               whole training split
+  - predict_spam                    one email per call, as in the notebook
+  - batch predict                   transform + predict over the whole test split
+
+For each stage it reports p50/p99 latency (per call), throughput (emails/sec)
+and the process's peak RSS so far. Each corpus size runs in a fresh child
+process so its peak RSS is not inflated by earlier, larger runs. Accuracy on
+the test split is reported with each size.
+
+Runs fully offline on a synthetic corpus, or on a local copy of the corpus:
+
+    python benchmark_classifier.py --sizes 1000 5000 20000 --output bench.json
+    python benchmark_classifier.py --spam-dir spam --ham-dir easy_ham --sizes 500 1000 2500
+    python benchmark_classifier.py --compare bench.json     # exit 1 on a >20% p50 regression
+
+Needs the shared ``model_runtime`` package (``pip install -e ../model_runtime`` in a checkout).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+import sklearn
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.naive_bayes import MultinomialNB
+from model_runtime.profiling import peak_rss_mb, run_in_child
+
+from preprocessing import clean_text, get_stopwords
+
+
+# Function to generate labelled email-shaped text with overlapping spam/ham vocabularies
+def synthetic_corpus(n, seed=0):
+    rng = random.Random(seed)
+    common = [f"term{i}" for i in range(20000)] + sorted(get_stopwords())
+    spam_words = ["free", "winner", "click", "offer", "cash", "prize", "viagra", "urgent", "$$$", "unsubscribe"]
+    ham_words = ["meeting", "patch", "release", "thanks", "review", "linux", "build", "agenda", "cvs", "list"]
+    texts, labels = [], []
+    for i in range(n):
+        label = 1 if rng.random() < 0.3 else 0
+        signal = spam_words if label else ham_words
+        words = [rng.choice(signal) if rng.random() < 0.05 else rng.choice(common) for _ in range(rng.randint(50, 500))]
+        texts.append(f"From: sender{i}@example.com\nSubject: message {i}\n\n" + " ".join(words))
+        labels.append(label)
+    return texts, labels
+
+
+def load_corpus(spam_dir, ham_dir):
+    texts, labels = [], []
+    for directory, label in ((spam_dir, 1), (ham_dir, 0)):
+        for filename in sorted(os.listdir(directory)):
+            if filename == "cmds":
+                continue
+            with open(os.path.join(directory, filename), "r", encoding="latin-1") as f:
+                texts.append(f.read())
+                labels.append(label)
+    return texts, labels
+
+
+def summarize(latencies, items):
+    latencies = np.asarray(latencies)
+    total = latencies.sum()
+    return {
+        "calls": len(latencies),
+        "items": items,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "total_s": float(total),
+        "throughput_per_sec": float(items / total) if total else float("inf"),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run_size(texts, labels, size, repeats, predict_samples, seed):
+    rng = random.Random(seed)
+    picked = rng.sample(range(len(texts)), size) if size < len(texts) else list(range(len(texts)))
+    texts = [texts[i] for i in picked]
+    labels = [labels[i] for i in picked]
+    stop_words = get_stopwords()
+    stages = {}
+
+    cleaned, latencies = [], []
+    for text in texts:
+        result, seconds = timed(clean_text, text, stop_words)
+        cleaned.append(result)
+        latencies.append(seconds)
+    stages["clean_text"] = summarize(latencies, len(texts))
+
+    X_train, X_test, y_train, y_test = train_test_split(cleaned, labels, test_size=0.2, random_state=42)
+
+    latencies = []
+    for _ in range(repeats):
+        vectorizer = TfidfVectorizer()
+        X_train_tfidf, seconds = timed(vectorizer.fit_transform, X_train)
+        latencies.append(seconds)
+    stages["tfidf_fit_transform"] = summarize(latencies, len(X_train) * repeats)
+    X_test_tfidf = vectorizer.transform(X_test)
+
+    latencies = []
+    for _ in range(repeats):
+        model = MultinomialNB()
+        _, seconds = timed(model.fit, X_train_tfidf, y_train)
+        latencies.append(seconds)
+    stages["nb_fit"] = summarize(latencies, len(X_train) * repeats)
+
+    # The notebook's predict_spam: one transform + predict per email
+    def predict_spam(email_text):
+        email_tfidf = vectorizer.transform([email_text])
+        prediction = model.predict(email_tfidf)[0]
+        return "Spam" if prediction == 1 else "Not Spam"
+
+    samples = X_test[:predict_samples]
+    latencies = [timed(predict_spam, email)[1] for email in samples]
+    stages["predict_spam"] = summarize(latencies, len(samples))
+
+    latencies = []
+    for _ in range(repeats):
+        y_pred, seconds = timed(lambda docs: model.predict(vectorizer.transform(docs)), X_test)
+        latencies.append(seconds)
+    stages["batch_predict"] = summarize(latencies, len(X_test) * repeats)
+
+    return {"size": len(texts), "accuracy": float(accuracy_score(y_test, y_pred)), "stages": stages}
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {run["size"]: run for run in json.load(f)["runs"]}
+    regressions = []
+    for run in results["runs"]:
+        base = baseline.get(run["size"])
+        if base is None:
+            continue
+        for stage, stats in run["stages"].items():
+            before = base["stages"].get(stage, {}).get("p50_ms")
+            if before and stats["p50_ms"] > before * (1 + tolerance):
+                regressions.append(f"size {run['size']} {stage}: p50 {before:.3f} ms -> {stats['p50_ms']:.3f} ms")
+        if run["accuracy"] < base["accuracy"] - 0.01:
+            regressions.append(f"size {run['size']} accuracy: {base['accuracy']:.3f} -> {run['accuracy']:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--spam-dir")
+    parser.add_argument("--ham-dir")
+    parser.add_argument("--repeats", type=int, default=5, help="runs of each whole-corpus stage")
+    parser.add_argument("--predict-samples", type=int, default=500, help="emails scored one at a time by predict_spam")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative p50 slowdown for --compare")
+    args = parser.parse_args()
+
+    if args.spam_dir and args.ham_dir:
+        texts, labels = load_corpus(args.spam_dir, args.ham_dir)
+        corpus = f"dirs:{args.spam_dir},{args.ham_dir}"
+    else:
+        texts, labels = synthetic_corpus(max(args.sizes), args.seed)
+        corpus = f"synthetic:seed={args.seed}"
+    get_stopwords()
+
+    results = {
+        "meta": {
+            "corpus": corpus,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sklearn": sklearn.__version__,
+            "cpu_count": os.cpu_count(),
+            "repeats": args.repeats,
+        },
+        "runs": [],
+    }
+    context = multiprocessing.get_context("fork") if hasattr(os, "fork") else multiprocessing.get_context()
+    for size in args.sizes:
+        # A failure in the child (e.g. a size too small to split) is raised here instead of hanging
+        run = run_in_child(run_size, (texts, labels, size, args.repeats, args.predict_samples, args.seed),
+                           context=context)
+        results["runs"].append(run)
+
+        print(f"\nsize={run['size']} accuracy={run['accuracy']:.3f}")
+        print(f"{'stage':<22} {'p50 ms':>10} {'p99 ms':>10} {'emails/sec':>12} {'peak RSS MB':>12}")
+        for stage, stats in run["stages"].items():
+            print(f"{stage:<22} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f} "
+                  f"{stats['throughput_per_sec']:>12.1f} {stats['peak_rss_mb']:>12.1f}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
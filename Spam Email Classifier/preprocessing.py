@@ -0,0 +1,92 @@
+"""Fast text preprocessing for the spam classifier.
+
+Drop-in replacement for the notebook's ``clean_text``: same output, but the
+stopword list is built once as a frozenset, regexes are precompiled, and
+whole corpora are cleaned in chunks across a process pool.
+
+    from preprocessing import preprocess
+    df["text"] = preprocess(df["text"].tolist())
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+NON_WORD_RE = re.compile(r"\W+")
+# Headers and body are separated by the first empty line
+HEADER_BODY_RE = re.compile(r"\r?\n\r?\n")
+
+_worker_stopwords = None
+
+
+@lru_cache(maxsize=None)
+def get_stopwords(language="english"):
+    """NLTK's stopword list as a frozenset, downloaded on first use if missing."""
+    import nltk
+    from nltk.corpus import stopwords
+    try:
+        words = stopwords.words(language)
+    except LookupError:
+        nltk.download("stopwords", quiet=True)
+        words = stopwords.words(language)
+    return frozenset(words)
+
+
+def split_email(raw):
+    """Split a raw RFC 822 message into (headers, body)."""
+    parts = HEADER_BODY_RE.split(raw, maxsplit=1)
+    if len(parts) == 1:
+        return "", parts[0]
+    return parts[0], parts[1]
+
+
+def clean_text(text, stop_words=None):
+    """Replace non-word runs with spaces, lowercase, and drop stopwords."""
+    if stop_words is None:
+        stop_words = get_stopwords()
+    words = NON_WORD_RE.sub(" ", text).lower().split()
+    return " ".join([word for word in words if word not in stop_words])
+
+
+def clean_email(raw, stop_words=None, include_headers=True):
+    """``clean_text`` over a raw message, optionally dropping the header block."""
+    if not include_headers:
+        raw = split_email(raw)[1]
+    return clean_text(raw, stop_words)
+
+
+def _init_worker(stop_words):
+    global _worker_stopwords
+    _worker_stopwords = stop_words
+
+
+def _clean_chunk(args):
+    chunk, include_headers = args
+    return [clean_email(text, _worker_stopwords, include_headers) for text in chunk]
+
+
+def make_pool(workers=None):
+    """Process pool whose workers hold the stopword set, reusable across many ``preprocess`` calls."""
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker,
+                               initargs=(get_stopwords(),))
+
+
+def preprocess(texts, workers=None, chunk_size=500, include_headers=True, pool=None):
+    """Clean a list of raw emails, in parallel chunks when it pays off.
+
+    ``workers`` defaults to the CPU count; ``workers=1`` (or a corpus that
+    fits in one chunk) runs in-process. Pass a ``pool`` from ``make_pool``
+    to reuse one set of worker processes across calls instead of starting
+    a new pool each time. Output order matches ``texts``.
+    """
+    texts = list(texts)
+    stop_words = get_stopwords()
+    workers = workers or os.cpu_count() or 1
+    if pool is None and (workers == 1 or len(texts) <= chunk_size):
+        return [clean_email(text, stop_words, include_headers) for text in texts]
+
+    chunks = [(texts[i:i + chunk_size], include_headers) for i in range(0, len(texts), chunk_size)]
+    if pool is not None:
+        return [text for chunk in pool.map(_clean_chunk, chunks) for text in chunk]
+    with make_pool(workers) as pool:
+        return [text for chunk in pool.map(_clean_chunk, chunks) for text in chunk]
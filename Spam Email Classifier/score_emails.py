@@ -0,0 +1,154 @@
+"""Batch / streaming spam scoring with the saved classifier pickles.
+
+Loads ``spam_classifier.pkl`` and ``vectorizer.pkl`` once (per worker), then
+scores messages in large vectorized batches and writes one tab-separated
+line per message: ``id  label  spam_probability``.
+
+Inputs can be Maildir directories (cur/ and new/), plain directories of
+message files (like the SpamAssassin corpus), mbox files, or stdin:
+
+    python score_emails.py ~/Maildir spam/ archive.mbox > scores.tsv
+    cat inbound.mbox | python score_emails.py - --workers 4
+    python score_emails.py - --stdin-format lines < one_email_per_line.txt
+"""
+import argparse
+import itertools
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from preprocessing import get_stopwords, preprocess
+
+_scorer = None
+
+
+class SpamScorer:
+    """The saved vectorizer + model, applied to whole batches of raw messages."""
+
+    def __init__(self, model_path="spam_classifier.pkl", vectorizer_path="vectorizer.pkl", threshold=0.5):
+        with open(model_path, "rb") as f:
+            self.model = pickle.load(f)
+        with open(vectorizer_path, "rb") as f:
+            self.vectorizer = pickle.load(f)
+        self.threshold = threshold
+        self.spam_column = list(self.model.classes_).index(1)
+        get_stopwords()
+
+    def score(self, texts):
+        """Return (labels, spam_probabilities) for a list of raw messages."""
+        X = self.vectorizer.transform(preprocess(texts, workers=1))
+        probabilities = self.model.predict_proba(X)[:, self.spam_column]
+        labels = ["Spam" if p >= self.threshold else "Not Spam" for p in probabilities]
+        return labels, probabilities
+
+
+def _init_worker(model_path, vectorizer_path, threshold):
+    global _scorer
+    _scorer = SpamScorer(model_path, vectorizer_path, threshold)
+
+
+def _score_batch(batch):
+    ids, texts = zip(*batch)
+    labels, probabilities = _scorer.score(list(texts))
+    return list(zip(ids, labels, probabilities.tolist()))
+
+
+# Function to split an mbox stream on its "From " separator lines without loading it whole
+def iter_mbox(lines, source):
+    message = []
+    index = 0
+    for line in lines:
+        if line.startswith("From ") and message:
+            yield f"{source}:{index}", "".join(message)
+            index += 1
+            message = []
+        if line.startswith("From ") and not message:
+            continue
+        message.append(line)
+    if message:
+        yield f"{source}:{index}", "".join(message)
+
+
+def iter_directory(path):
+    # Maildir keeps delivered mail in cur/ and new/; anything else is a flat directory of messages
+    subdirs = [os.path.join(path, name) for name in ("cur", "new") if os.path.isdir(os.path.join(path, name))]
+    for directory in subdirs or [path]:
+        for name in sorted(os.listdir(directory)):
+            file_path = os.path.join(directory, name)
+            if name == "cmds" or not os.path.isfile(file_path):
+                continue
+            with open(file_path, "r", encoding="latin-1") as f:
+                yield file_path, f.read()
+
+
+def iter_messages(inputs, stdin_format="mbox"):
+    """Yield (id, raw_text) for every message in ``inputs`` ("-" means stdin)."""
+    for source in inputs:
+        if source == "-":
+            stdin = (line.decode("latin-1") for line in sys.stdin.buffer)
+            if stdin_format == "lines":
+                for index, line in enumerate(stdin):
+                    yield f"stdin:{index}", line
+            else:
+                yield from iter_mbox(stdin, "stdin")
+        elif os.path.isdir(source):
+            yield from iter_directory(source)
+        else:
+            with open(source, "r", encoding="latin-1") as f:
+                yield from iter_mbox(f, source)
+
+
+def iter_batches(messages, batch_size):
+    while True:
+        batch = list(itertools.islice(messages, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def score_stream(messages, model_path, vectorizer_path, batch_size=5000, workers=1, threshold=0.5):
+    """Yield (id, label, probability) in input order, batching and optionally using worker processes."""
+    batches = iter_batches(iter(messages), batch_size)
+    if workers <= 1:
+        _init_worker(model_path, vectorizer_path, threshold)
+        for batch in batches:
+            yield from _score_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, vectorizer_path, threshold)) as pool:
+        # Keep a bounded number of batches in flight so memory does not grow with the input
+        pending = []
+        for batch in batches:
+            pending.append(pool.submit(_score_batch, batch))
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="Maildir/message directories, mbox files, or - for stdin")
+    parser.add_argument("--model", default="spam_classifier.pkl")
+    parser.add_argument("--vectorizer", default="vectorizer.pkl")
+    parser.add_argument("--stdin-format", choices=["mbox", "lines"], default="mbox")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threshold", type=float, default=0.5, help="spam probability at or above which a message is labelled Spam")
+    parser.add_argument("--output", help="write results here instead of stdout")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        messages = iter_messages(args.inputs, args.stdin_format)
+        for message_id, label, probability in score_stream(messages, args.model, args.vectorizer,
+                                                           args.batch_size, args.workers, args.threshold):
+            out.write(f"{message_id}\t{label}\t{probability:.6f}\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Out-of-core training straight from the SpamAssassin .tar.bz2 archives.
+
+Messages are read member by member from the compressed tarballs (nothing is
+extracted to disk), cleaned with ``preprocessing``, vectorized in fixed-size
+chunks with a stateless ``HashingVectorizer`` and fed to
+``MultinomialNB.partial_fit``. Only one chunk is in memory at a time, so peak
+memory stays flat however large the corpus is.
+
+A deterministic ~20% of messages (by content hash) is held out of training
+and scored in a second streaming pass.
+
+    python streaming_train.py --spam 20030228_spam.tar.bz2 --ham 20030228_easy_ham.tar.bz2
+"""
+import argparse
+import itertools
+import os
+import pickle
+import tarfile
+import time
+import zlib
+from contextlib import nullcontext
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.naive_bayes import MultinomialNB
+
+from preprocessing import make_pool, preprocess
+
+CLASSES = np.array([0, 1])
+
+
+def make_vectorizer(n_features=2 ** 20):
+    """Stateless replacement for TfidfVectorizer: no vocabulary, so no fitting pass.
+
+    ``alternate_sign=False`` keeps features non-negative, as MultinomialNB requires.
+    """
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm="l2")
+
+
+def iter_tar_emails(path, label):
+    """Yield (text, label) for every message in a .tar.bz2 archive, streaming."""
+    with tarfile.open(path, "r|bz2") as tar:
+        for member in tar:
+            # Each SpamAssassin directory also holds a "cmds" file that is not an email
+            if not member.isfile() or os.path.basename(member.name) == "cmds":
+                continue
+            f = tar.extractfile(member)
+            yield f.read().decode("latin-1"), label
+
+
+def iter_corpus(archives):
+    """Round-robin over several (path, label) archives so chunks mix both classes."""
+    streams = [iter_tar_emails(path, label) for path, label in archives]
+    for group in itertools.zip_longest(*streams):
+        for item in group:
+            if item is not None:
+                yield item
+
+
+def is_holdout(text, holdout_percent):
+    return zlib.crc32(text.encode("latin-1", "replace")) % 100 < holdout_percent
+
+
+def iter_chunks(pairs, chunk_size):
+    while True:
+        chunk = list(itertools.islice(pairs, chunk_size))
+        if not chunk:
+            return
+        texts, labels = zip(*chunk)
+        yield list(texts), np.array(labels)
+
+
+# Function to clean one chunk, splitting it evenly over the shared pool's workers
+def preprocess_chunk(texts, workers, pool):
+    if pool is None:
+        return preprocess(texts, workers=1)
+    return preprocess(texts, chunk_size=-(-len(texts) // workers), pool=pool)
+
+
+def preprocess_pool(workers, pool=None):
+    """Context for the run's preprocessing pool: the caller's ``pool``, a new one for ``workers > 1``, or none."""
+    if pool is not None or workers == 1:
+        return nullcontext(pool)
+    return make_pool(workers)
+
+
+def train_streaming(archives, chunk_size=1000, holdout_percent=20, workers=1, vectorizer=None, model=None, pool=None):
+    """Train incrementally over ``archives`` (a list of (path, label)).
+
+    Returns (model, vectorizer, stats). Pass an existing ``model`` to keep
+    training it on new archives. With ``workers > 1`` one process pool
+    serves every chunk (pass ``pool`` to share it with other passes).
+    """
+    vectorizer = vectorizer or make_vectorizer()
+    model = model or MultinomialNB()
+    pairs = ((text, label) for text, label in iter_corpus(archives) if not is_holdout(text, holdout_percent))
+
+    trained = 0
+    chunks = 0
+    start = time.perf_counter()
+    with preprocess_pool(workers, pool) as pool:
+        for texts, labels in iter_chunks(pairs, chunk_size):
+            X = vectorizer.transform(preprocess_chunk(texts, workers, pool))
+            model.partial_fit(X, labels, classes=CLASSES)
+            trained += len(labels)
+            chunks += 1
+    elapsed = time.perf_counter() - start
+    return model, vectorizer, {"trained": trained, "chunks": chunks, "seconds": elapsed,
+                               "emails_per_sec": trained / elapsed if elapsed else 0.0}
+
+
+def evaluate_streaming(model, vectorizer, archives, chunk_size=1000, holdout_percent=20, workers=1, pool=None):
+    """Accuracy on the held-out messages, read in a second streaming pass."""
+    pairs = ((text, label) for text, label in iter_corpus(archives) if is_holdout(text, holdout_percent))
+    correct = 0
+    total = 0
+    with preprocess_pool(workers, pool) as pool:
+        for texts, labels in iter_chunks(pairs, chunk_size):
+            predictions = model.predict(vectorizer.transform(preprocess_chunk(texts, workers, pool)))
+            correct += int((predictions == labels).sum())
+            total += len(labels)
+    return correct / total if total else float("nan"), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spam", nargs="+", required=True, help="spam .tar.bz2 archives")
+    parser.add_argument("--ham", nargs="+", required=True, help="ham .tar.bz2 archives")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--holdout-percent", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="preprocessing processes, shared by every chunk")
+    parser.add_argument("--model-out", default="spam_classifier.pkl")
+    parser.add_argument("--vectorizer-out", default="vectorizer.pkl")
+    args = parser.parse_args()
+
+    archives = [(path, 1) for path in args.spam] + [(path, 0) for path in args.ham]
+    # One pool for both passes: worker processes start once per run, not once per chunk
+    with preprocess_pool(args.workers) as pool:
+        model, vectorizer, stats = train_streaming(archives, args.chunk_size, args.holdout_percent, args.workers,
+                                                   pool=pool)
+        print(f"Trained on {stats['trained']} emails in {stats['chunks']} chunks "
+              f"({stats['emails_per_sec']:.0f} emails/sec)")
+
+        accuracy, evaluated = evaluate_streaming(model, vectorizer, archives, args.chunk_size, args.holdout_percent,
+                                                 args.workers, pool=pool)
+    print(f"Model Accuracy: {accuracy:.2f} on {evaluated} held-out emails")
+
+    with open(args.model_out, "wb") as f:
+        pickle.dump(model, f)
+    with open(args.vectorizer_out, "wb") as f:
+        pickle.dump(vectorizer, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,77 +1,83 @@
 import os
 import requests
 import streamlit as st
-import matplotlib.pyplot as plt
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from charts import line_chart
+from esg_batch import CARBON_INTERFACE_URL, METRICS, CarbonInterfaceClient, load_scores, score_history
 
 # Load API key securely from environment variables
 CARBON_INTERFACE_API_KEY = os.getenv("CARBON_INTERFACE_API_KEY")
+# Parquet output of esg_batch.py (batch scores for the whole universe)
+ESG_SCORES_DIR = os.getenv("ESG_SCORES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "esg_scores"))
+
+# Pooled, retrying client shared by all sessions
+@st.cache_resource
+def load_client():
+    return CarbonInterfaceClient(CARBON_INTERFACE_API_KEY, CARBON_INTERFACE_URL)
+
+# Function to fetch environmental data from Carbon Interface (cached for an hour)
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_environmental_data(company_name):
+    return load_client().estimate(company_name)
 
 # Function to get environmental data from Carbon Interface
 def get_environmental_data(company_name):
     if not CARBON_INTERFACE_API_KEY:
         st.error("API key is missing. Please set the CARBON_INTERFACE_API_KEY environment variable.")
         return None
-
-    url = f"https://www.carboninterface.com/api/v1/estimates?company={company_name}"
-    headers = {
-        "Authorization": f"Bearer {CARBON_INTERFACE_API_KEY}"
-    }
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        if "data" in data:
-            return data["data"]
-        else:
-            st.error("No environmental data found for the given company.")
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching data: {e}")
+        data = fetch_environmental_data(company_name)
+        if data is None:
+            st.error(f"No environmental data found for {company_name}.")
+        return data
+    except (requests.exceptions.RequestException, ValueError) as e:
+        st.error(f"Error fetching data for {company_name}: {e}")
     return None
 
-# Function to extract environmental scores
-def extract_environmental_scores(environmental_data):
-    if not environmental_data:
-        return None, None, None
-
-    years = ["2021", "2022", "2023", "2024", "2025"]  # Example years
-    env_scores = [environmental_data.get("carbon_emissions", "N/A")] * 5
-    soc_scores = [environmental_data.get("carbon_efficiency", "N/A")] * 5
-    gov_scores = [environmental_data.get("sustainability_rating", "N/A")] * 5
-
-    return years, env_scores, soc_scores, gov_scores
-
-# Function to plot historical environmental trends
-def plot_environmental_trends(company_name, years, env_scores, soc_scores, gov_scores):
-    plt.figure(figsize=(8, 4))
-    plt.plot(years, env_scores, label="Carbon Emissions", marker="o", linestyle="--", color="green")
-    plt.plot(years, soc_scores, label="Carbon Efficiency", marker="o", linestyle="--", color="blue")
-    plt.plot(years, gov_scores, label="Sustainability Rating", marker="o", linestyle="--", color="red")
-
-    plt.xlabel("Year")
-    plt.ylabel("Score")
-    plt.title(f"📈 Environmental Trends for {company_name}")
-    plt.legend()
-    plt.grid(True)
-
-    st.pyplot(plt)
+# Function to load the batch universe scores (re-read when the files change)
+@st.cache_data(ttl=60, show_spinner=False)
+def get_universe_scores():
+    return load_scores(ESG_SCORES_DIR)
+
+# Function to plot environmental trends from the stored batch snapshots
+def plot_environmental_trends(company_name, history):
+    dates = history["fetched_at"].dt.tz_localize(None).to_numpy()
+    series = {label: history[metric].to_numpy() for metric, label in METRICS.items()
+              if pd.api.types.is_numeric_dtype(history[metric])}
+    styles = {"Carbon Emissions": {"marker": "o", "linestyle": "--", "color": "green"},
+              "Carbon Efficiency": {"marker": "o", "linestyle": "--", "color": "blue"}}
+    st.image(line_chart(dates, series, title=f"📈 Environmental Trends for {company_name}", xlabel="Date",
+                        ylabel="Score", width=8, height=4, grid=True, styles=styles))
 
 # Function to compare environmental data with competitors
-def compare_with_competitors(company_name, competitors):
-    competitor_scores = {}
+def compare_with_competitors(company_name, environmental_data, competitors, universe):
+    competitor_scores = {company_name: environmental_data}
+    # Batch scores first; only companies outside the universe go to the API, concurrently
+    missing = [comp for comp in competitors if comp not in universe.index]
     for comp in competitors:
-        data = get_environmental_data(comp)
-        if data:
-            competitor_scores[comp] = {
-                "Carbon Emissions": data.get("carbon_emissions", "N/A"),
-                "Carbon Efficiency": data.get("carbon_efficiency", "N/A"),
-                "Sustainability Rating": data.get("sustainability_rating", "N/A")
-            }
+        if comp in universe.index:
+            competitor_scores[comp] = universe.loc[comp, list(METRICS)].to_dict()
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as pool:
+            futures = {comp: pool.submit(fetch_environmental_data, comp) for comp in missing}
+            for comp, future in futures.items():
+                # One failing competitor is reported and skipped; the rest of the comparison still renders
+                try:
+                    data = future.result()
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    st.warning(f"Could not fetch data for {comp}: {e}")
+                    continue
+                if data:
+                    competitor_scores[comp] = data
 
     st.subheader(f"📊 Environmental Comparison: {company_name} vs Competitors")
     st.write("Comparison of environmental data across companies:")
 
-    if competitor_scores:
-        st.table(competitor_scores)
+    if len(competitor_scores) > 1:
+        table = pd.DataFrame({comp: {label: data.get(metric, "N/A") for metric, label in METRICS.items()}
+                              for comp, data in competitor_scores.items()}).T
+        st.table(table)
     else:
         st.write("No competitor data available.")
 
@@ -79,12 +85,14 @@ def compare_with_competitors(company_name, competitors):
 st.title("🌱 Sustainability & ESG Agent")
 st.write("Ensure AI-driven business strategies align with ESG goals.")
 
+universe = get_universe_scores()
+
 # Input for company name
 company_name = st.text_input("🔍 Enter Company Name", value="Apple Inc.")
 
 if company_name:
     environmental_data = get_environmental_data(company_name)
-    
+
     st.subheader(f"📊 Environmental Data for {company_name}")
 
     if environmental_data:
@@ -92,17 +100,32 @@ if company_name:
         st.write(f"**Carbon Efficiency:** {environmental_data.get('carbon_efficiency', 'N/A')}")
         st.write(f"**Sustainability Rating:** {environmental_data.get('sustainability_rating', 'N/A')}")
 
-        # Extract and display environmental trends
-        years, env_scores, soc_scores, gov_scores = extract_environmental_scores(environmental_data)
-        if years and env_scores and soc_scores and gov_scores:
+        # Trends come from the snapshots stored by earlier batch runs
+        history = score_history(ESG_SCORES_DIR, company_name)
+        if len(history) > 1:
             st.subheader("📈 Environmental Historical Trends")
-            plot_environmental_trends(company_name, years, env_scores, soc_scores, gov_scores)
+            plot_environmental_trends(company_name, history)
+        else:
+            st.caption("Historical trends appear once esg_batch.py has scored this company in more than one run.")
 
-        # Compare with competitors (example: Microsoft, Tesla, Google)
-        competitors = ["Microsoft", "Tesla", "Google"]
-        compare_with_competitors(company_name, competitors)
+        # Compare with competitors (defaults: Microsoft, Tesla, Google)
+        options = sorted(set(universe.index) | {"Microsoft", "Tesla", "Google"})
+        defaults = [c for c in ["Microsoft", "Tesla", "Google"] if c != company_name]
+        competitors = st.multiselect("Competitors", [c for c in options if c != company_name], default=defaults)
+        compare_with_competitors(company_name, environmental_data, competitors, universe)
 
     else:
         st.write("No environmental data found.")
 
-st.success("✅ Environmental Report Updated!")
\ No newline at end of file
+# Universe-wide scores from the batch job, sortable in the table
+if len(universe):
+    st.subheader(f"🌍 ESG Universe ({len(universe):,} companies)")
+    sort_by = st.selectbox("Sort by", list(METRICS), format_func=METRICS.get)
+    ascending = st.checkbox("Ascending", value=True)
+    ranked = universe.sort_values(sort_by, ascending=ascending).rename(columns=METRICS)
+    if company_name in universe.index:
+        rank = ranked.index.get_loc(company_name) + 1
+        st.write(f"🔹 **{company_name}** ranks {rank:,} of {len(ranked):,} by {METRICS[sort_by].lower()}.")
+    st.dataframe(ranked)
+
+st.success("✅ Environmental Report Updated!")
@@ -0,0 +1,103 @@
+"""Local stand-in for the Carbon Interface estimates endpoint, for offline batch runs.
+
+Answers ``GET /api/v1/estimates?company=...`` with deterministic figures
+derived from the company name. It can also add latency, return a share of
+429/503 responses to exercise retries, and answer 404 for unknown
+companies:
+
+    python carbon_stub.py --port 8765 --latency-ms 50 --failure-rate 0.1
+    CARBON_INTERFACE_API_KEY=test python esg_batch.py universe.txt --base-url http://127.0.0.1:8765
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# Function to derive stable ESG figures from a company name
+def stub_estimate(company):
+    seed = int(hashlib.sha256(company.encode("utf-8")).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    return {
+        "company": company,
+        "carbon_emissions": round(rng.uniform(1e3, 5e6), 1),
+        "carbon_efficiency": round(rng.uniform(0, 100), 2),
+        "sustainability_rating": rng.choice(["AAA", "AA", "A", "BBB", "BB", "B", "CCC"]),
+    }
+
+
+class CarbonStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, failure_rate=0.0, unknown_rate=0.0):
+        super().__init__(address, _Handler)
+        self.latency = latency_ms / 1000
+        self.failure_rate = failure_rate
+        self.unknown_rate = unknown_rate
+        self.requests = 0
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def start(self):
+        """Serve on a background thread; returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _send(self, status, payload=None, headers=None):
+        body = json.dumps(payload or {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server._lock:
+            server.requests += 1
+            roll = server._rng.random()
+        time.sleep(server.latency)
+        url = urlparse(self.path)
+        company = parse_qs(url.query).get("company", [""])[0]
+        if url.path != "/api/v1/estimates" or not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._send(401 if url.path == "/api/v1/estimates" else 404, {"error": "unauthorized"})
+        if roll < server.failure_rate:
+            return self._send(429 if roll < server.failure_rate / 2 else 503, {"error": "try again"},
+                              {"Retry-After": "0"})
+        # "Unknown" companies are picked by name, so the same ones are missing on every run
+        if int(hashlib.sha256(company.encode("utf-8")).hexdigest()[8:12], 16) / 0xFFFF < server.unknown_rate:
+            return self._send(404, {"error": "not found"})
+        self._send(200, {"data": stub_estimate(company)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--unknown-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = CarbonStubServer((args.host, args.port), args.latency_ms, args.failure_rate, args.unknown_rate)
+    print(f"Carbon Interface stub on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
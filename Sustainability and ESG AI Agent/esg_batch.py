@@ -0,0 +1,258 @@
+"""Batch ESG scoring for a universe of companies, with checkpointing and Parquet output.
+
+Companies are fetched from Carbon Interface on a bounded thread pool over a
+pooled session that retries 429/5xx responses with backoff (honouring
+``Retry-After``). Results are flushed every ``checkpoint_every`` companies
+as a Parquet part file under ``<output>/run=<run id>/``, so an interrupted
+run picks up where it stopped: rerunning resumes the latest unfinished run
+and skips every company already scored in it (failed ones are retried).
+A finished run is compacted into one file; it is marked with ``_SUCCESS``
+only once no company failed, so until then a rerun retries just the failures.
+
+    python esg_batch.py universe.txt --output esg_scores --workers 16
+    python esg_batch.py universe.csv --column name --base-url http://127.0.0.1:8765   # against carbon_stub.py
+
+The UI reads the latest score per company with ``load_scores(output)``.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CARBON_INTERFACE_URL = os.getenv("CARBON_INTERFACE_URL", "https://www.carboninterface.com")
+METRICS = {"carbon_emissions": "Carbon Emissions", "carbon_efficiency": "Carbon Efficiency",
+           "sustainability_rating": "Sustainability Rating"}
+SCHEMA_COLUMNS = ["company", "status", *METRICS, "error", "fetched_at"]
+
+
+class CarbonInterfaceClient:
+    """Pooled, retrying client for the Carbon Interface estimates endpoint."""
+
+    def __init__(self, api_key, base_url=CARBON_INTERFACE_URL, pool_size=16, retries=4, timeout=15, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+        retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def estimate(self, company):
+        """The ``data`` object for one company, or None when the API has none."""
+        response = self.session.get(f"{self.base_url}/api/v1/estimates", params={"company": company},
+                                    timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json().get("data") or None
+
+
+# Function to flatten one API answer (or failure) into a result row
+def score_record(company, data=None, error=None):
+    row = {"company": company, "status": "ok" if data else ("error" if error else "not_found"),
+           "error": str(error) if error else None, "fetched_at": datetime.now(timezone.utc)}
+    for metric in METRICS:
+        value = (data or {}).get(metric)
+        row[metric] = None if value is None else str(value)
+    return row
+
+
+def _to_frame(rows):
+    frame = pd.DataFrame(rows, columns=SCHEMA_COLUMNS)
+    # Numeric metrics are stored as float64 so the UI can sort them; anything else stays text
+    for metric in ("carbon_emissions", "carbon_efficiency"):
+        frame[metric] = pd.to_numeric(frame[metric], errors="coerce")
+    frame["sustainability_rating"] = frame["sustainability_rating"].astype("string")
+    frame["fetched_at"] = pd.to_datetime(frame["fetched_at"], utc=True)
+    return frame
+
+
+# Function to read a universe file: one name per line, or a CSV column
+def read_universe(path, column=None):
+    if column:
+        names = pd.read_csv(path, usecols=[column])[column]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            names = pd.Series([line.strip() for line in f])
+    names = names.dropna().astype(str).str.strip()
+    return list(dict.fromkeys(name for name in names if name))
+
+
+class BatchScorer:
+    """Scores a universe concurrently and checkpoints results as Parquet parts."""
+
+    def __init__(self, client, output, workers=8, checkpoint_every=200):
+        self.client = client
+        self.output = output
+        self.workers = workers
+        self.checkpoint_every = checkpoint_every
+        os.makedirs(output, exist_ok=True)
+
+    def _run_dir(self, run_id):
+        return os.path.join(self.output, f"run={run_id}")
+
+    # Function to find the latest run that never finished
+    def unfinished_run(self):
+        runs = sorted(d[len("run="):] for d in os.listdir(self.output) if d.startswith("run="))
+        if runs and not os.path.exists(os.path.join(self._run_dir(runs[-1]), "_SUCCESS")):
+            return runs[-1]
+        return None
+
+    def completed(self, run_id):
+        """Companies already scored (ok or not found) in ``run_id``."""
+        run_dir = self._run_dir(run_id)
+        parts = [os.path.join(run_dir, p) for p in os.listdir(run_dir) if p.endswith(".parquet")] \
+            if os.path.isdir(run_dir) else []
+        if not parts:
+            return set()
+        done = pd.concat([pd.read_parquet(p, columns=["company", "status"]) for p in parts])
+        return set(done.loc[done["status"] != "error", "company"])
+
+    def _fetch(self, company):
+        try:
+            return score_record(company, self.client.estimate(company))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return score_record(company, error=e)
+
+    def _flush(self, run_id, rows):
+        if not rows:
+            return
+        run_dir = self._run_dir(run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        part = len([p for p in os.listdir(run_dir) if p.endswith(".parquet")])
+        path = os.path.join(run_dir, f"part-{part:05d}.parquet")
+        # Write then rename, so a crash mid-write never leaves a truncated part behind
+        _to_frame(rows).to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+
+    def _compact(self, run_id, success=True):
+        run_dir = self._run_dir(run_id)
+        parts = sorted(os.path.join(run_dir, p) for p in os.listdir(run_dir) if p.endswith(".parquet"))
+        if parts:
+            frame = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+            frame = frame.sort_values("fetched_at").drop_duplicates("company", keep="last")
+            target = os.path.join(run_dir, "scores.parquet")
+            frame.to_parquet(target + ".tmp", index=False)
+            os.replace(target + ".tmp", target)
+            # Parts go only once the compacted file is in place
+            for part in parts:
+                if part != target:
+                    os.remove(part)
+        if success:
+            open(os.path.join(run_dir, "_SUCCESS"), "w").close()
+
+    def run(self, companies, run_id=None, progress=None):
+        """Score ``companies``, resuming the latest unfinished run unless ``run_id`` is given.
+
+        A run with failed companies stays unfinished, so the next call retries only those.
+
+        Returns ``(run_id, stats)``; ``progress(done, total)`` is called as results arrive.
+        """
+        run_id = run_id or self.unfinished_run() or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        done = self.completed(run_id)
+        todo = [c for c in dict.fromkeys(companies) if c not in done]
+        stats = {"skipped": len(done), "ok": 0, "not_found": 0, "error": 0, "seconds": 0.0}
+        start = time.perf_counter()
+        buffer = []
+        pending = set()
+        remaining = iter(todo)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                try:
+                    # Keep a bounded window of requests in flight instead of queueing the whole universe
+                    for company in remaining:
+                        pending.add(pool.submit(self._fetch, company))
+                        if len(pending) < self.workers * 2:
+                            continue
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        self._collect(finished, buffer, stats, run_id, progress, len(todo))
+                    while pending:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        self._collect(finished, buffer, stats, run_id, progress, len(todo))
+                except BaseException:
+                    # Queued requests never start; the pool still waits for the ones already running
+                    for future in pending:
+                        future.cancel()
+                    raise
+        finally:
+            # Whatever finished before or during an interruption is kept for the next resume
+            for future in pending:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    row = future.result()
+                    buffer.append(row)
+                    stats[row["status"]] += 1
+            self._flush(run_id, buffer)
+            stats["seconds"] = time.perf_counter() - start
+
+        self._compact(run_id, success=stats["error"] == 0)
+        return run_id, stats
+
+    def _collect(self, finished, buffer, stats, run_id, progress, total):
+        for future in finished:
+            row = future.result()
+            buffer.append(row)
+            stats[row["status"]] += 1
+        if len(buffer) >= self.checkpoint_every:
+            self._flush(run_id, buffer)
+            buffer.clear()
+        if progress is not None:
+            progress(stats["ok"] + stats["not_found"] + stats["error"], total)
+
+
+# Function to load the latest successful score per company across every run
+def load_scores(output, columns=None):
+    parts = [os.path.join(root, name) for root, _, names in os.walk(output) for name in names
+             if name.endswith(".parquet")]
+    if not parts:
+        return _to_frame([]).drop(columns=["status", "error"]).set_index("company")
+    frame = pd.concat([pd.read_parquet(p, columns=columns and ["company", "status", "fetched_at", *columns])
+                       for p in parts], ignore_index=True)
+    frame = frame[frame["status"] == "ok"].sort_values("fetched_at").drop_duplicates("company", keep="last")
+    return frame.drop(columns=["status", "error"], errors="ignore").set_index("company").sort_index()
+
+
+# Function to load every successful snapshot of one company, oldest first
+def score_history(output, company):
+    parts = [os.path.join(root, name) for root, _, names in os.walk(output) for name in names
+             if name.endswith(".parquet")]
+    frames = [pd.read_parquet(p, filters=[("company", "==", company)]) for p in parts]
+    if not frames:
+        return _to_frame([])
+    frame = pd.concat(frames, ignore_index=True)
+    return frame[frame["status"] == "ok"].sort_values("fetched_at").reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("universe", help="text file with one company per line, or a CSV with --column")
+    parser.add_argument("--column", default=None)
+    parser.add_argument("--output", default=os.getenv("ESG_SCORES_DIR", "esg_scores"))
+    parser.add_argument("--base-url", default=CARBON_INTERFACE_URL)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--checkpoint-every", type=int, default=200)
+    parser.add_argument("--run-id", default=None, help="resume or create this run instead of the latest unfinished one")
+    args = parser.parse_args()
+
+    api_key = os.getenv("CARBON_INTERFACE_API_KEY")
+    if not api_key:
+        parser.error("set the CARBON_INTERFACE_API_KEY environment variable")
+    client = CarbonInterfaceClient(api_key, args.base_url, pool_size=args.workers)
+    scorer = BatchScorer(client, args.output, args.workers, args.checkpoint_every)
+    companies = read_universe(args.universe, args.column)
+    run_id, stats = scorer.run(companies, args.run_id,
+                               progress=lambda done, total: print(f"\r{done:,}/{total:,}", end="", flush=True))
+    print(f"\nrun {run_id}: {stats['ok']:,} scored, {stats['not_found']:,} not found, {stats['error']:,} failed, "
+          f"{stats['skipped']:,} resumed in {stats['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""Thread-safe, cached and downsampled chart rendering for the Streamlit agents."""
+from .render import DEFAULT_CACHE, ChartCache, downsample, line_chart, lttb, minmax
+
+__all__ = ["line_chart", "downsample", "lttb", "minmax", "ChartCache", "DEFAULT_CACHE"]
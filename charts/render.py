@@ -0,0 +1,167 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+# Function to pick at most `n_out` points that preserve the visual shape (Largest-Triangle-Three-Buckets)
+def lttb(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # First and last points are always kept; the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # Average of the next bucket is the third vertex of the triangle
+        cx = x[end:next_end].mean() if next_end > end else x[-1]
+        cy = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs((x[a] - cx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (cy - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+# Function to keep each bucket's min and max point (in order), fully vectorized
+def minmax(y, n_out):
+    n = len(y)
+    buckets = max(n_out // 2, 1)
+    if n <= n_out:
+        return np.arange(n)
+    size = int(np.ceil(n / buckets))
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(buckets, size)
+    valid = ~np.isnan(blocks).all(axis=1)
+    offsets = np.arange(buckets) * size
+    lo = np.nanargmin(np.where(valid[:, None], blocks, 0), axis=1) + offsets
+    hi = np.nanargmax(np.where(valid[:, None], blocks, 0), axis=1) + offsets
+    keep = np.sort(np.concatenate([lo[valid], hi[valid]]))
+    return np.unique(keep[keep < n])
+
+
+# Function to downsample one series to about `n_out` points; x may be numeric or datetime64
+def downsample(x, y, n_out, method="lttb"):
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    finite = ~np.isnan(y)
+    x, y = x[finite], y[finite]
+    if len(y) <= n_out:
+        return x, y
+    if method == "minmax":
+        keep = minmax(y, n_out)
+    elif method == "lttb":
+        x_num = x.astype("datetime64[ns]").astype(np.int64).astype(float) if np.issubdtype(x.dtype, np.datetime64) \
+            else x.astype(float)
+        keep = lttb(x_num, y, n_out)
+    else:
+        raise ValueError(f"Unknown downsampling method {method!r}")
+    return x[keep], y[keep]
+
+
+class ChartCache:
+    """LRU cache of rendered PNG bytes, bounded by total size."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            if key in self._items:
+                self._bytes -= len(self._items.pop(key))
+            if len(png) > self.max_bytes:
+                return
+            self._items[key] = png
+            self._bytes += len(png)
+            while self._bytes > self.max_bytes:
+                self._bytes -= len(self._items.popitem(last=False)[1])
+
+
+DEFAULT_CACHE = ChartCache()
+
+
+# Function to hash the plotted data and every plot parameter into a cache key
+def chart_key(x, series, params):
+    digest = hashlib.blake2b(digest_size=20)
+    x = np.asarray(x)
+    digest.update(str(x.dtype).encode())
+    digest.update(np.ascontiguousarray(x).tobytes() if x.dtype != object else json.dumps(list(map(str, x))).encode())
+    for label, y in series.items():
+        digest.update(str(label).encode())
+        digest.update(np.ascontiguousarray(np.asarray(y, dtype=float)).tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def line_chart(x, series, title="", xlabel="", ylabel="", width=10, height=5, dpi=100, hline=None, grid=False,
+               styles=None, legend=True, method="minmax", cache=DEFAULT_CACHE):
+    """Render ``series`` ({label: y values}) against ``x`` as PNG bytes.
+
+    Each series is downsampled to the plot's pixel width first (``minmax``
+    keeps every spike; ``lttb`` follows the shape more smoothly), drawing
+    uses a figure object of its own (no global pyplot state), and the PNG is
+    cached by a hash of the data and every parameter.
+    """
+    styles = styles or {}
+    params = {"title": title, "xlabel": xlabel, "ylabel": ylabel, "size": (width, height, dpi), "hline": hline,
+              "grid": grid, "styles": styles, "legend": legend, "method": method}
+    key = chart_key(x, series, params) if cache is not None else None
+    if cache is not None:
+        png = cache.get(key)
+        if png is not None:
+            return png
+
+    fig = Figure(figsize=(width, height), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    n_out = int(width * dpi)
+    categorical = np.asarray(x).dtype == object
+    for label, y in series.items():
+        xs, ys = (np.asarray(x), np.asarray(y, dtype=float)) if categorical else downsample(x, y, n_out, method)
+        ax.plot(xs, ys, label=label, **styles.get(label, {}))
+    if hline is not None:
+        ax.axhline(y=hline, color="black", linestyle="--", linewidth=0.5)
+    if legend and any(label for label in series):
+        ax.legend()
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(grid)
+    if np.issubdtype(np.asarray(x).dtype, np.datetime64):
+        # Concise labels fit without rotating (cheaper than autofmt_xdate)
+        locator = AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+
+    buffer = io.BytesIO()
+    # Fast zlib level: a chart PNG compresses well enough either way
+    fig.savefig(buffer, format="png", pil_kwargs={"compress_level": 1})
+    png = buffer.getvalue()
+    if cache is not None:
+        cache.put(key, png)
+    return png
@@ -0,0 +1,7 @@
+"""Shared, cached market-data access for the finance agents (Alpha Vantage, FRED, FMP)."""
+from .cache import ResponseCache
+from .client import DEFAULT_TTL, ENDPOINT_TTLS, MarketDataClient, RateLimitTimeout
+from .scheduler import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, RequestScheduler, TokenBucket
+
+__all__ = ["MarketDataClient", "ResponseCache", "ENDPOINT_TTLS", "DEFAULT_TTL", "RateLimitTimeout",
+           "RequestScheduler", "TokenBucket", "PRIORITY_HIGH", "PRIORITY_NORMAL", "PRIORITY_LOW"]
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class ResponseCache:
+    """On-disk JSON response cache with a per-entry TTL.
+
+    Entries are keyed by URL + query parameters (API keys excluded, so apps
+    using different keys share cached payloads). Expired entries are ignored
+    on read and replaced on the next write.
+    """
+
+    # Query parameters that identify the caller rather than the data
+    SECRET_PARAMS = ("apikey", "api_key", "apiKey", "token")
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, url, params=None):
+        public = {k: v for k, v in (params or {}).items() if k not in self.SECRET_PARAMS}
+        raw = json.dumps([url, sorted(public.items())], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key, ttl, count=True):
+        """Return (payload, fetched_at) if a fresh entry exists, else None (``count=False`` skips the hit/miss counters)."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+        fresh = entry is not None and time.time() - entry["fetched_at"] <= ttl
+        if count:
+            with self._lock:
+                if fresh:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        if not fresh:
+            return None
+        return entry["payload"], entry["fetched_at"]
+
+    def set(self, key, url, payload):
+        fetched_at = time.time()
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "fetched_at": fetched_at, "payload": payload}, f)
+        os.replace(tmp_path, self._path(key))
+        return fetched_at
+
+    def purge_expired(self, max_age):
+        """Delete entries older than ``max_age`` seconds."""
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".json") and now - os.path.getmtime(path) > max_age:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,221 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache import ResponseCache
+from .scheduler import PRIORITY_NORMAL, RequestScheduler
+
+ALPHA_VANTAGE_URL = os.getenv("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co/query")
+FRED_URL = os.getenv("FRED_BASE_URL", "https://api.stlouisfed.org/fred")
+FMP_URL = os.getenv("FMP_BASE_URL", "https://financialmodelingprep.com/api/v3")
+DEFAULT_CACHE_DIR = os.getenv("MARKET_DATA_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "market_data"))
+# Free tier quota; raise it for premium keys
+ALPHA_VANTAGE_CALLS_PER_MINUTE = int(os.getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", "5"))
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+# How long a payload stays fresh, per endpoint
+ENDPOINT_TTLS = {
+    "TIME_SERIES_DAILY": 6 * HOUR,       # one new bar per trading day
+    "TIME_SERIES_INTRADAY": 1 * MINUTE,
+    "GLOBAL_QUOTE": 1 * MINUTE,
+    "OVERVIEW": 24 * HOUR,               # fundamentals change quarterly
+    "SECTOR": 1 * HOUR,
+    "fred/series/observations": 12 * HOUR,  # FRED series are released at most daily
+    "fmp/profile": 24 * HOUR,
+}
+DEFAULT_TTL = 5 * MINUTE
+# urllib3 sleeps backoff_factor * 2 ** n seconds (at most) before retry n + 1
+RETRY_BACKOFF_FACTOR = 0.5
+
+# Alpha Vantage answers throttled or invalid calls with HTTP 200 and one of these keys
+ALPHA_VANTAGE_ERROR_KEYS = ("Note", "Information", "Error Message")
+ALPHA_VANTAGE_THROTTLE_KEYS = ("Note", "Information")
+
+
+# Function to reject JSON error bodies such as NewsAPI's {"status": "error", ...} from the cache
+def status_ok(payload):
+    return not (isinstance(payload, dict) and payload.get("status", "ok") != "ok")
+
+
+class RateLimitTimeout(requests.exceptions.RequestException):
+    """A request waited longer than ``queue_timeout`` for a rate-limit slot."""
+
+
+class MarketDataClient:
+    """Shared access to Alpha Vantage, FRED and Financial Modeling Prep.
+
+    - one pooled ``requests.Session`` (keep-alive, retries on 429/5xx)
+    - an on-disk response cache with a TTL per endpoint (``ENDPOINT_TTLS``),
+      shared by every app pointing at the same ``cache_dir``
+    - an in-memory cache of parsed results (e.g. daily bars as a DataFrame),
+      valid for as long as the payload it was parsed from
+
+    - cache misses go through a ``RequestScheduler``: Alpha Vantage calls wait
+      for a token from a per-key bucket (``alpha_vantage_calls_per_minute``)
+      in priority order, and identical requests already queued or in flight
+      are coalesced into one upstream call
+
+    Base URLs can be overridden, so the client can be tested against a local
+    fake server. HTTP errors raise ``requests.exceptions.RequestException``,
+    like the ``requests.get`` calls this replaces, and so does waiting more than
+    ``queue_timeout`` seconds for a rate-limit slot (``RateLimitTimeout``).
+    Throttling or error payloads are returned but never cached.
+    """
+
+    def __init__(self, alpha_vantage_key=None, fred_key=None, fmp_key=None, cache_dir=DEFAULT_CACHE_DIR,
+                 alpha_vantage_url=ALPHA_VANTAGE_URL, fred_url=FRED_URL, fmp_url=FMP_URL,
+                 timeout=15, retries=3, pool_size=16, session=None,
+                 alpha_vantage_calls_per_minute=ALPHA_VANTAGE_CALLS_PER_MINUTE, queue_timeout=120):
+        self.alpha_vantage_key = alpha_vantage_key if alpha_vantage_key is not None else os.getenv("ALPHA_VANTAGE_API_KEY")
+        self.fred_key = fred_key if fred_key is not None else os.getenv("FRED_API_KEY")
+        self.fmp_key = fmp_key if fmp_key is not None else os.getenv("FMP_API_KEY")
+        self.alpha_vantage_url = alpha_vantage_url
+        self.fred_url = fred_url.rstrip("/")
+        self.fmp_url = fmp_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = ResponseCache(cache_dir)
+        self.session = session or self._make_session(pool_size, retries)
+        self.queue_timeout = queue_timeout
+        self.scheduler = RequestScheduler(workers=pool_size)
+        # One bucket per API key; the name never contains the key itself
+        key_id = hashlib.sha256(str(self.alpha_vantage_key).encode("utf-8")).hexdigest()[:8]
+        self.alpha_vantage_limit = f"alpha_vantage:{key_id}"
+        self.scheduler.add_limit(self.alpha_vantage_limit, alpha_vantage_calls_per_minute, 60)
+        self._parsed = {}
+        self._parsed_lock = threading.Lock()
+
+    @staticmethod
+    def _make_session(pool_size, retries):
+        session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=RETRY_BACKOFF_FACTOR, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request_budget(self):
+        """Worst-case seconds for one upstream call: every attempt hitting ``timeout``, plus the retry backoff."""
+        return self.timeout * (self.retries + 1) + sum(RETRY_BACKOFF_FACTOR * 2 ** n for n in range(self.retries))
+
+    # Function to fetch JSON through the disk cache and the scheduler; returns (payload, fetched_at)
+    def _fetch(self, url, params, ttl, cacheable=lambda payload: True, limit=None, priority=PRIORITY_NORMAL,
+               throttled=lambda payload: False):
+        key = self.cache.key(url, params)
+        cached = self.cache.get(key, ttl)
+        if cached is not None:
+            return cached
+
+        def request():
+            # Another request may have filled the cache while this one was queued (already counted as a miss)
+            cached = self.cache.get(key, ttl, count=False)
+            if cached is not None:
+                return cached
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            payload = response.json()
+            if limit is not None and throttled(payload):
+                self.scheduler.backoff(limit)
+            if not cacheable(payload):
+                return payload, None
+            return payload, self.cache.set(key, url, payload)
+
+        future = self.scheduler.submit(request, dedup_key=key, limit=limit, priority=priority)
+        try:
+            return future.result(timeout=self.queue_timeout)
+        except FuturesTimeoutError:
+            raise RateLimitTimeout(f"Gave up after {self.queue_timeout}s waiting for a rate-limit slot for {url}") from None
+
+    def get_json(self, url, params=None, ttl=DEFAULT_TTL, cacheable=status_ok):
+        """Any JSON GET, through the pooled session and the disk cache (only payloads passing ``cacheable`` are stored)."""
+        return self._fetch(url, params or {}, ttl, cacheable)[0]
+
+    # Function to memoize a parsed view of a payload for as long as the payload itself is fresh
+    def _parsed_result(self, name, payload, fetched_at, ttl, parse):
+        if fetched_at is None:
+            return parse(payload)
+        with self._parsed_lock:
+            entry = self._parsed.get(name)
+            if entry and entry[0] == fetched_at and time.time() - fetched_at <= ttl:
+                return entry[1]
+        value = parse(payload)
+        with self._parsed_lock:
+            self._parsed[name] = (fetched_at, value)
+        return value
+
+    # --- Alpha Vantage -------------------------------------------------
+
+    def alpha_vantage(self, function, priority=PRIORITY_NORMAL, **params):
+        """Raw Alpha Vantage payload for ``function`` (e.g. "OVERVIEW")."""
+        return self._alpha_vantage(function, priority, **params)[0]
+
+    def _alpha_vantage(self, function, priority=PRIORITY_NORMAL, **params):
+        query = {"function": function, **params, "apikey": self.alpha_vantage_key}
+        ttl = ENDPOINT_TTLS.get(function, DEFAULT_TTL)
+        cacheable = lambda payload: isinstance(payload, dict) and not any(k in payload for k in ALPHA_VANTAGE_ERROR_KEYS)
+        throttled = lambda payload: isinstance(payload, dict) and any(k in payload for k in ALPHA_VANTAGE_THROTTLE_KEYS)
+        return self._fetch(self.alpha_vantage_url, query, ttl, cacheable, limit=self.alpha_vantage_limit,
+                           priority=priority, throttled=throttled)
+
+    def daily_series(self, symbol, outputsize="compact", priority=PRIORITY_NORMAL):
+        """The full TIME_SERIES_DAILY payload (check for "Time Series (Daily)" before use)."""
+        return self.alpha_vantage("TIME_SERIES_DAILY", priority, symbol=symbol, outputsize=outputsize)
+
+    def daily_bars(self, symbol, outputsize="compact", priority=PRIORITY_NORMAL):
+        """Daily bars as a float DataFrame indexed by date (oldest first), or None if unavailable."""
+        payload, fetched_at = self._alpha_vantage("TIME_SERIES_DAILY", priority, symbol=symbol, outputsize=outputsize)
+
+        def parse(payload):
+            if "Time Series (Daily)" not in payload:
+                return None
+            df = pd.DataFrame.from_dict(payload["Time Series (Daily)"], orient="index", dtype=float)
+            df.index = pd.to_datetime(df.index)
+            return df.sort_index()
+        bars = self._parsed_result(("daily_bars", symbol, outputsize), payload, fetched_at,
+                                   ENDPOINT_TTLS["TIME_SERIES_DAILY"], parse)
+        # Callers may add columns; never hand out the cached frame itself
+        return None if bars is None else bars.copy()
+
+    def latest_close(self, symbol, priority=PRIORITY_NORMAL):
+        """Most recent daily close, or None if the series is unavailable."""
+        bars = self.daily_bars(symbol, priority=priority)
+        if bars is None or bars.empty:
+            return None
+        return float(bars["4. close"].iloc[-1])
+
+    def overview(self, symbol, priority=PRIORITY_NORMAL):
+        return self.alpha_vantage("OVERVIEW", priority, symbol=symbol)
+
+    def sector_performance(self, priority=PRIORITY_NORMAL):
+        return self.alpha_vantage("SECTOR", priority)
+
+    # --- FRED ------------------------------------------------------------
+
+    def fred_observations(self, series_id):
+        """List of {"date", "value", ...} observations for a FRED series."""
+        payload = self._fetch(f"{self.fred_url}/series/observations",
+                              {"series_id": series_id, "api_key": self.fred_key, "file_type": "json"},
+                              ENDPOINT_TTLS["fred/series/observations"],
+                              lambda payload: "observations" in payload)[0]
+        return payload.get("observations", [])
+
+    # --- Financial Modeling Prep ----------------------------------------
+
+    def fmp_profile(self, symbol):
+        """Company profile dict, or {} when FMP has none."""
+        payload = self._fetch(f"{self.fmp_url}/profile/{symbol}", {"apikey": self.fmp_key},
+                              ENDPOINT_TTLS["fmp/profile"], lambda payload: isinstance(payload, list))[0]
+        return payload[0] if isinstance(payload, list) and payload else {}
+
+    def metrics(self):
+        """Cache hit/miss counts plus scheduler queue depth, wait times and coalesced requests."""
+        return {"cache": {"hits": self.cache.hits, "misses": self.cache.misses}, **self.scheduler.metrics()}
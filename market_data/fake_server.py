@@ -0,0 +1,169 @@
+"""Local fake of the Alpha Vantage, FRED and FMP endpoints the client uses, plus a smoke check.
+
+Payloads are deterministic per symbol/series. ``throttle`` makes the next N
+Alpha Vantage calls answer with a ``Note`` throttling payload, and
+``latency_ms`` slows every response so concurrent requests overlap:
+
+    server = FakeMarketServer(latency_ms=50).start()
+    client = MarketDataClient("key", "key", "key", cache_dir=tmp, **server.client_urls())
+
+``python -m market_data.fake_server`` runs ``check()``: caching, request
+coalescing, throttling payloads kept out of the cache, and the cache
+counters. It exits 1 on the first failure.
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# Function to build a deterministic TIME_SERIES_DAILY payload
+def daily_series_payload(symbol, days=100):
+    rng = random.Random(symbol)
+    price = rng.uniform(20, 500)
+    series = {}
+    for i in range(days):
+        day = date(2024, 1, 1) + timedelta(days=i)
+        price *= 1 + rng.gauss(0, 0.01)
+        series[day.isoformat()] = {"1. open": f"{price:.2f}", "2. high": f"{price * 1.01:.2f}",
+                                   "3. low": f"{price * 0.99:.2f}", "4. close": f"{price:.2f}",
+                                   "5. volume": str(rng.randint(10 ** 5, 10 ** 7))}
+    return {"Meta Data": {"2. Symbol": symbol}, "Time Series (Daily)": series}
+
+
+class FakeMarketServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency_ms=0):
+        super().__init__(address, _Handler)
+        self.latency = latency_ms / 1000
+        self.throttle = 0
+        self.requests = []  # (path, query) of every request served
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def client_urls(self):
+        """Keyword arguments pointing a ``MarketDataClient`` at this server."""
+        return {"alpha_vantage_url": f"{self.url}/query", "fred_url": f"{self.url}/fred",
+                "fmp_url": f"{self.url}/fmp"}
+
+    def start(self):
+        """Serve on a background thread; returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def count(self, path_prefix=""):
+        with self._lock:
+            return sum(1 for path, _ in self.requests if path.startswith(path_prefix))
+
+    def _alpha_vantage(self, query):
+        with self._lock:
+            if self.throttle > 0:
+                self.throttle -= 1
+                return {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}
+        function, symbol = query.get("function"), query.get("symbol", "")
+        if function == "TIME_SERIES_DAILY":
+            return daily_series_payload(symbol)
+        if function == "OVERVIEW":
+            return {"Symbol": symbol, "Name": f"{symbol} Inc.", "Sector": "TECHNOLOGY"}
+        return {"Error Message": f"Invalid API call: {function}"}
+
+    def payload(self, path, query):
+        if path == "/query":
+            return 200, self._alpha_vantage(query)
+        if path == "/fred/series/observations":
+            return 200, {"observations": [{"date": f"2024-{m:02d}-01", "value": str(100 + m)} for m in range(1, 13)]}
+        if path.startswith("/fmp/profile/"):
+            symbol = path.rsplit("/", 1)[-1]
+            return 200, [{"symbol": symbol, "companyName": f"{symbol} Inc.", "mktCap": 10 ** 9}]
+        return 404, {"error": "not found"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with self.server._lock:
+            self.server.requests.append((url.path, query))
+        time.sleep(self.server.latency)
+        status, payload = self.server.payload(url.path, query)
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check():
+    """Exercise a fresh client against a fake server; returns a list of failures (empty when all pass)."""
+    from .client import MarketDataClient
+
+    failures = []
+
+    def expect(condition, message):
+        if not condition:
+            failures.append(message)
+
+    server = FakeMarketServer(latency_ms=50).start()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        client = MarketDataClient("key", "key", "key", cache_dir=cache_dir, alpha_vantage_calls_per_minute=600,
+                                  **server.client_urls())
+
+        bars = client.daily_bars("AAPL")
+        expect(bars is not None and len(bars) == 100, "daily_bars should parse 100 bars")
+        client.daily_bars("AAPL")
+        expect(server.count("/query") == 1, f"repeat daily_bars should be cached, saw {server.count('/query')} calls")
+        expect(client.metrics()["cache"] == {"hits": 1, "misses": 1},
+               f"cache counters should be 1 hit / 1 miss, got {client.metrics()['cache']}")
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            list(pool.map(lambda _: client.overview("MSFT"), range(10)))
+        expect(server.count("/query") == 2, f"10 identical overview calls should cost 1 request, saw "
+                                            f"{server.count('/query') - 1}")
+
+        server.throttle = 1
+        note = client.overview("TSLA")
+        expect("Note" in note, "throttled call should return the Note payload")
+        expect(client.overview("TSLA").get("Symbol") == "TSLA", "throttle payload must not be cached")
+
+        expect(len(client.fred_observations("GDP")) == 12, "fred_observations should return 12 observations")
+        expect(client.fmp_profile("NVDA").get("symbol") == "NVDA", "fmp_profile should return the first profile")
+    server.shutdown()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", action="store_true", help="only run the fake server (Ctrl-C to stop)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    if args.serve:
+        server = FakeMarketServer(("127.0.0.1", args.port), args.latency_ms)
+        print(f"Fake market-data server on {server.url} (alpha_vantage_url={server.url}/query)")
+        server.serve_forever()
+        return
+    failures = check()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("ok" if not failures else f"{len(failures)} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
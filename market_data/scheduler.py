@@ -0,0 +1,160 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Lower runs first: interactive page loads ahead of background refreshes
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class TokenBucket:
+    """``calls`` tokens per ``period`` seconds, holding at most ``burst`` tokens."""
+
+    def __init__(self, calls, period, burst=None):
+        self.rate = calls / period
+        self.capacity = burst if burst is not None else calls
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now):
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def seconds_until_token(self, now):
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def drain(self, now):
+        """Empty the bucket, e.g. after the upstream reported throttling anyway."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class _Job:
+    __slots__ = ("fn", "future", "dedup_key", "limit", "queued_at")
+
+    def __init__(self, fn, dedup_key, limit):
+        self.fn = fn
+        self.future = Future()
+        self.dedup_key = dedup_key
+        self.limit = limit
+        self.queued_at = time.monotonic()
+
+
+class RequestScheduler:
+    """Runs outbound calls through per-limit token buckets and priority queues.
+
+    - ``add_limit(name, calls, period)`` registers a token bucket (e.g. one per
+      API key); jobs submitted with ``limit=name`` wait in that bucket's
+      priority queue until a token is free. Jobs without a limit run at once.
+    - Jobs with the same ``dedup_key`` that are queued or running share one
+      Future, so concurrent identical requests cause a single upstream call.
+    - ``metrics()`` reports queue depth, wait times and coalesced requests.
+    """
+
+    def __init__(self, workers=8):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="market-data")
+        self._cond = threading.Condition()
+        self._buckets = {}
+        self._queues = {}
+        self._in_flight = {}
+        self._seq = itertools.count()
+        self._stats = {"submitted": 0, "coalesced": 0, "dispatched": 0, "throttled": 0,
+                       "wait_count": 0, "wait_total": 0.0, "wait_max": 0.0}
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="market-data-scheduler", daemon=True)
+        self._dispatcher.start()
+
+    def add_limit(self, name, calls, period, burst=None):
+        with self._cond:
+            if name not in self._buckets:
+                self._buckets[name] = TokenBucket(calls, period, burst)
+                self._queues[name] = []
+
+    def submit(self, fn, dedup_key=None, limit=None, priority=PRIORITY_NORMAL):
+        """Schedule ``fn()``; returns a Future (shared with any identical in-flight request)."""
+        with self._cond:
+            self._stats["submitted"] += 1
+            if dedup_key is not None and dedup_key in self._in_flight:
+                self._stats["coalesced"] += 1
+                return self._in_flight[dedup_key].future
+            job = _Job(fn, dedup_key, limit)
+            if dedup_key is not None:
+                self._in_flight[dedup_key] = job
+            if limit is None:
+                self._start(job)
+            else:
+                heapq.heappush(self._queues[limit], (priority, next(self._seq), job))
+                self._cond.notify()
+            return job.future
+
+    def backoff(self, limit):
+        """Drain ``limit``'s bucket after the upstream rejected a call for exceeding its quota."""
+        with self._cond:
+            self._stats["throttled"] += 1
+            self._buckets[limit].drain(time.monotonic())
+
+    # Function to hand a job to the worker pool (caller holds the lock)
+    def _start(self, job):
+        wait = time.monotonic() - job.queued_at
+        self._stats["dispatched"] += 1
+        self._stats["wait_count"] += 1
+        self._stats["wait_total"] += wait
+        self._stats["wait_max"] = max(self._stats["wait_max"], wait)
+        self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            result = job.fn()
+        except BaseException as e:
+            self._finish(job)
+            job.future.set_exception(e)
+        else:
+            self._finish(job)
+            job.future.set_result(result)
+
+    def _finish(self, job):
+        if job.dedup_key is not None:
+            with self._cond:
+                if self._in_flight.get(job.dedup_key) is job:
+                    del self._in_flight[job.dedup_key]
+
+    def _dispatch_loop(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                timeout = None
+                for name, queue in self._queues.items():
+                    bucket = self._buckets[name]
+                    while queue and bucket.try_acquire(now):
+                        self._start(heapq.heappop(queue)[2])
+                    if queue:
+                        delay = bucket.seconds_until_token(now)
+                        timeout = delay if timeout is None else min(timeout, delay)
+                self._cond.wait(timeout)
+
+    def metrics(self):
+        with self._cond:
+            stats = dict(self._stats)
+            now = time.monotonic()
+            stats["queues"] = {
+                name: {
+                    "depth": len(queue),
+                    "oldest_wait": max((now - job.queued_at for _, _, job in queue), default=0.0),
+                    "tokens": round(self._buckets[name].tokens, 2),
+                }
+                for name, queue in self._queues.items()
+            }
+            stats["in_flight"] = len(self._in_flight)
+        count = stats.pop("wait_count")
+        stats["wait_mean"] = stats.pop("wait_total") / count if count else 0.0
+        return stats
@@ -0,0 +1,6 @@
+"""Background-loaded transformer pipelines with an optional int8 CPU inference profile, and request micro-batching."""
+from .batching import MicroBatcher
+from .lazy_pipeline import CPUProfile, LazyPipeline
+from .profiling import ChildProcessFailed, peak_rss_mb, run_in_child
+
+__all__ = ["LazyPipeline", "CPUProfile", "peak_rss_mb", "run_in_child", "ChildProcessFailed", "MicroBatcher"]
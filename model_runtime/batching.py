@@ -0,0 +1,100 @@
+"""Micro-batching of concurrent requests onto one worker thread."""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Coalesces concurrent requests into batches handled by a single worker thread.
+
+    ``submit(key, item)`` queues a request and returns a ``Future``; a request
+    whose key is already queued or being processed shares that future. The
+    worker blocks for the first request, then keeps collecting for up to
+    ``max_wait_ms`` or until ``max_batch_size`` are pending, and calls
+    ``process_batch([(key, item), ...])``. It returns ``{key: result}``; an
+    exception instance as a value fails just that key, a missing key fails
+    with ``RuntimeError`` and a raised exception fails the whole batch. Every
+    key leaves the pending set however the batch ends, so no caller waits on
+    a future nobody resolves.
+    """
+
+    def __init__(self, process_batch, max_batch_size=32, max_wait_ms=5, name="micro-batcher"):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+
+        self._pending = {}  # key -> Future for requests queued or being processed
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+
+        self.batches = 0
+        self.processed = 0
+        self.largest_batch = 0
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._worker.start()
+
+    def submit(self, key, item):
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = Future()
+                self._pending[key] = future
+                self._queue.put((key, item))
+                self._ensure_worker()
+        return future
+
+    # Function to collect the next batch: block for one request, then drain until full or the window closes
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            results, error = {}, None
+            try:
+                results = self.process_batch(batch)
+            except Exception as e:
+                error = e
+            finally:
+                with self._lock:
+                    succeeded = sum(1 for key, _ in batch
+                                    if key in results and not isinstance(results[key], BaseException))
+                    if succeeded:
+                        self.batches += 1
+                        self.processed += succeeded
+                        self.largest_batch = max(self.largest_batch, succeeded)
+                    futures = [(key, self._pending.pop(key, None)) for key, _ in batch]
+                for key, future in futures:
+                    if future is None or future.done():
+                        continue
+                    result = results.get(key, error or RuntimeError(f"No result was produced for {key!r}"))
+                    if isinstance(result, BaseException):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+    def stats(self):
+        """Batches run, results produced and the largest batch so far."""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "processed": self.processed,
+                "avg_batch_size": self.processed / self.batches if self.batches else 0.0,
+                "max_batch_size": self.largest_batch,
+            }
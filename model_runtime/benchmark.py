@@ -0,0 +1,113 @@
+"""Cold start / memory / throughput benchmark: default pipeline vs. the int8 CPU profile.
+
+Each configuration runs in a fresh child process so that cold start and peak
+RSS are measured independently:
+
+  - cold start   seconds from ``import transformers`` to a loaded pipeline
+  - first call   latency of the first inference (lazy kernels, caches)
+  - tokens/sec   generated tokens per second over ``--runs`` timed calls
+  - peak RSS     the child process's peak resident memory
+
+    python -m model_runtime.benchmark --task summarization --model facebook/bart-large-cnn
+    python -m model_runtime.benchmark --task text-generation --model facebook/opt-350m --threads 4
+    python -m model_runtime.benchmark ... --output bench.json
+
+Run from the repository root. Models must be downloadable or already in the
+Hugging Face cache.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import time
+
+from .lazy_pipeline import CPUProfile
+from .profiling import peak_rss_mb, run_in_child
+
+SAMPLE_TEXT = (
+    "Stocks rose on Tuesday as investors weighed fresh inflation data against strong corporate earnings. "
+    "The S&P 500 gained 0.8 percent, led by technology and energy shares, while Treasury yields edged lower. "
+    "Analysts said the latest consumer price report showed inflation cooling faster than expected, "
+    "raising hopes that the Federal Reserve could pause its rate increases. Oil prices climbed on supply concerns. "
+) * 6
+
+
+# Function to run one configuration (in a child process) and report its measurements
+def run_config(task, model, profile_name, threads, max_input_tokens, runs, new_tokens):
+    start = time.perf_counter()
+    from transformers import pipeline
+
+    pipe = pipeline(task, model=model, device=-1)
+    if profile_name == "int8":
+        CPUProfile(num_threads=threads, max_input_tokens=max_input_tokens).apply(pipe)
+    elif threads:
+        import torch
+        torch.set_num_threads(threads)
+    cold_start = time.perf_counter() - start
+
+    if task == "summarization":
+        kwargs = {"max_length": new_tokens, "min_length": new_tokens, "do_sample": False, "truncation": True}
+    else:
+        kwargs = {"max_new_tokens": new_tokens, "min_new_tokens": new_tokens, "do_sample": False}
+
+    start = time.perf_counter()
+    pipe(SAMPLE_TEXT, **kwargs)
+    first_call = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pipe(SAMPLE_TEXT, **kwargs)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "profile": profile_name,
+        "cold_start_s": cold_start,
+        "first_call_s": first_call,
+        "mean_latency_s": sum(latencies) / len(latencies),
+        "tokens_per_s": new_tokens * runs / sum(latencies),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--task", default="summarization", choices=["summarization", "text-generation"])
+    parser.add_argument("--model", default="facebook/bart-large-cnn")
+    parser.add_argument("--profiles", nargs="+", default=["default", "int8"], choices=["default", "int8"])
+    parser.add_argument("--threads", type=int, default=None, help="torch threads (default: torch's choice)")
+    parser.add_argument("--max-input-tokens", type=int, default=512)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--new-tokens", type=int, default=64)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per configuration")
+    args = parser.parse_args()
+
+    results = []
+    ctx = multiprocessing.get_context("spawn")
+    for profile_name in args.profiles:
+        # A failed download or load is raised here (with the child's traceback) instead of hanging
+        result = run_in_child(run_config, (args.task, args.model, profile_name, args.threads, args.max_input_tokens,
+                                           args.runs, args.new_tokens), context=ctx, timeout=args.timeout)
+        results.append(result)
+        print(f"{profile_name:>8}: cold start {result['cold_start_s']:.1f}s, first call {result['first_call_s']:.2f}s, "
+              f"{result['tokens_per_s']:.1f} tokens/s, peak RSS {result['peak_rss_mb']:.0f} MB")
+
+    report = {
+        "task": args.task,
+        "model": args.model,
+        "threads": args.threads,
+        "max_input_tokens": args.max_input_tokens,
+        "runs": args.runs,
+        "new_tokens": args.new_tokens,
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
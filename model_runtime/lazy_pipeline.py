@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+# Opt-in CPU inference profile: MODEL_CPU_PROFILE=int8
+CPU_PROFILE = os.getenv("MODEL_CPU_PROFILE", "")
+NUM_THREADS = int(os.getenv("MODEL_NUM_THREADS", "0")) or None
+MAX_INPUT_TOKENS = int(os.getenv("MODEL_MAX_INPUT_TOKENS", "512"))
+
+
+class CPUProfile:
+    """CPU inference settings: dynamic int8 quantization, torch thread count and a fixed max input length."""
+
+    def __init__(self, quantize=True, num_threads=NUM_THREADS, max_input_tokens=MAX_INPUT_TOKENS):
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self.max_input_tokens = max_input_tokens
+
+    @classmethod
+    def from_env(cls):
+        """The profile selected by MODEL_CPU_PROFILE, or None for the full-precision default."""
+        return cls() if CPU_PROFILE.lower() == "int8" else None
+
+    def apply(self, pipe):
+        import torch
+
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        if self.quantize:
+            # Linear layers hold nearly all the weights of BART/OPT; int8 weights, fp32 activations
+            pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+        if self.max_input_tokens:
+            pipe.tokenizer.model_max_length = min(pipe.tokenizer.model_max_length, self.max_input_tokens)
+        return pipe
+
+    def describe(self):
+        return {"quantize": self.quantize, "num_threads": self.num_threads, "max_input_tokens": self.max_input_tokens}
+
+
+class LazyPipeline:
+    """A ``transformers.pipeline`` built on a background thread.
+
+    ``start()`` returns immediately, so the UI can bind while the model
+    downloads and loads. ``ready()`` / ``status()`` are the readiness check;
+    calling the pipeline (or reading ``tokenizer``) waits for the load to
+    finish and re-raises any load error.
+    """
+
+    def __init__(self, task, model, profile=None, **pipeline_kwargs):
+        self.task = task
+        self.model = model
+        self.profile = profile
+        self.pipeline_kwargs = {"device": -1, **pipeline_kwargs}
+        self.load_seconds = None
+        self._pipe = None
+        self._error = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name=f"load-{self.model}", daemon=True)
+                self._thread.start()
+        return self
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            from transformers import pipeline
+
+            pipe = pipeline(self.task, model=self.model, **self.pipeline_kwargs)
+            self._pipe = self.profile.apply(pipe) if self.profile else pipe
+        except Exception as e:
+            self._error = e
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            self._loaded.set()
+
+    def ready(self):
+        return self._loaded.is_set() and self._error is None
+
+    def status(self):
+        if not self._loaded.is_set():
+            return f"Loading {self.model}..." if self._thread else f"{self.model} not started"
+        if self._error is not None:
+            return f"Failed to load {self.model}: {self._error}"
+        return f"{self.model} ready (loaded in {self.load_seconds:.1f}s)"
+
+    def wait(self, timeout=None):
+        """Block until loaded (starting the load if needed); returns ``ready()``."""
+        self.start()
+        self._loaded.wait(timeout)
+        return self.ready()
+
+    def _get(self):
+        self.wait()
+        if self._error is not None:
+            raise RuntimeError(f"Model {self.model} failed to load") from self._error
+        return self._pipe
+
+    @property
+    def tokenizer(self):
+        return self._get().tokenizer
+
+    def _truncate(self, text):
+        if not self.profile or not self.profile.max_input_tokens:
+            return text
+        tokenizer = self._pipe.tokenizer
+        ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+        if len(ids) <= self.profile.max_input_tokens:
+            return text
+        return tokenizer.decode(ids[:self.profile.max_input_tokens], skip_special_tokens=True)
+
+    def __call__(self, inputs, **kwargs):
+        pipe = self._get()
+        if isinstance(inputs, str):
+            inputs = self._truncate(inputs)
+        elif isinstance(inputs, list):
+            inputs = [self._truncate(text) if isinstance(text, str) else text for text in inputs]
+        return pipe(inputs, **kwargs)
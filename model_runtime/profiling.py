@@ -0,0 +1,63 @@
+"""Helpers shared by the benchmarks: peak memory, and measuring a function in its own process."""
+import multiprocessing
+import queue as queue_module
+import resource
+import sys
+import traceback
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB."""
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class ChildProcessFailed(RuntimeError):
+    """The function run by ``run_in_child`` raised, or its process died without a result."""
+
+
+def _child_main(queue, target, args):
+    try:
+        queue.put((True, target(*args)))
+    except BaseException:
+        queue.put((False, traceback.format_exc()))
+
+
+def run_in_child(target, args=(), context=None, timeout=None, poll_interval=1.0):
+    """Return ``target(*args)`` computed in a fresh process, so its peak RSS and cold start are its own.
+
+    An exception in the child is raised here as ``ChildProcessFailed`` carrying the
+    child's traceback; so is a child that exits without a result (killed, out of
+    memory) or, with ``timeout``, one that runs too long. The child is always joined.
+    """
+    context = context or multiprocessing.get_context()
+    queue = context.Queue()
+    child = context.Process(target=_child_main, args=(queue, target, args))
+    child.start()
+    waited = 0.0
+    received = False
+    try:
+        while not received:
+            try:
+                ok, value = queue.get(timeout=poll_interval)
+                received = True
+            except queue_module.Empty:
+                waited += poll_interval
+                if not child.is_alive():
+                    # The child may have put its result just before exiting
+                    try:
+                        ok, value = queue.get(timeout=poll_interval)
+                        received = True
+                    except queue_module.Empty:
+                        raise ChildProcessFailed(f"{target.__name__} exited with code {child.exitcode} "
+                                                 "without a result") from None
+                elif timeout is not None and waited >= timeout:
+                    raise ChildProcessFailed(f"{target.__name__} did not finish within {timeout:.0f}s")
+    finally:
+        if not received and child.is_alive():
+            child.terminate()
+        child.join()
+    if not ok:
+        raise ChildProcessFailed(f"{target.__name__} failed in the child process:\n{value}")
+    return value